@@ -0,0 +1,60 @@
+"""
+Compares building a TrackDb one track at a time with building it in bulk from
+columns (see TrackDb.from_columns).
+
+Usage::
+
+    python benchmarks/bulk_trackdb.py [ntracks]
+
+Both approaches validate every parameter: one track at a time via
+add_params(), as a hub built from a sample sheet typically would, and in bulk
+via validate_column().
+"""
+
+import sys
+import time
+import trackhub
+
+
+def columns(n):
+    return dict(
+        name=["sample%d" % i for i in range(n)],
+        tracktype=["bigWig"] * n,
+        source=["sample%d.bw" % i for i in range(n)],
+        color=[("128,0,0", "0,0,128", "0,128,0")[i % 3] for i in range(n)],
+        visibility=["full"] * n,
+        maxHeightPixels=["8:50:128"] * n,
+    )
+
+
+def one_by_one(cols, n):
+    trackdb = trackhub.TrackDb()
+    for i in range(n):
+        row = dict((k, v[i]) for k, v in cols.items())
+        track = trackhub.Track(
+            name=row.pop("name"),
+            tracktype=row.pop("tracktype"),
+            source=row.pop("source"),
+        )
+        track.add_params(**row)
+        trackdb.add_tracks(track)
+    return trackdb
+
+
+def bulk(cols, n):
+    return trackhub.TrackDb.from_columns(cols)
+
+
+def main(n):
+    cols = columns(n)
+    for func in (one_by_one, bulk):
+        trackhub.validate.validation_cache.clear()
+        t0 = time.time()
+        trackdb = func(cols, n)
+        assert len(trackdb.tracks) == n
+        print("{0:<12}{1} tracks in {2:.2f}s".format(func.__name__, n, time.time() - t0))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    main(n)
@@ -0,0 +1,67 @@
+"""
+Measures memory and traversal cost over repeated renders of a hub whose tracks
+have HTML documentation.
+
+Usage::
+
+    python benchmarks/html_render.py [ntracks] [nrenders]
+
+Each track's documentation is a single child component, so neither the memory
+in use nor the time taken to walk the hierarchy should grow from one render to
+the next.
+"""
+
+import sys
+import gc
+import time
+import tempfile
+import tracemalloc
+import trackhub
+
+
+def build(n):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    trackdb.add_tracks(
+        [
+            trackhub.Track(
+                name="sample%d" % i,
+                tracktype="bigWig",
+                url="sample%d.bw" % i,
+                html_string="Sample %d" % i,
+                html_string_format="html",
+            )
+            for i in range(n)
+        ]
+    )
+    return hub
+
+
+def main(n, renders):
+    hub = build(n)
+    staging = tempfile.mkdtemp()
+    tracemalloc.start()
+    for i in range(1, renders + 1):
+        hub.render(staging)
+        if i == 1 or i % 25 == 0:
+            gc.collect()
+            t0 = time.time()
+            ncomponents = sum(1 for _ in hub.leaves(trackhub.base.HubComponent))
+            elapsed = time.time() - t0
+            print(
+                "render {0:3d}: {1:.1f} MB in use, {2} leaves walked in "
+                "{3:.1f} ms".format(
+                    i,
+                    tracemalloc.get_traced_memory()[0] / 1e6,
+                    ncomponents,
+                    elapsed * 1000,
+                )
+            )
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    renders = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    main(n, renders)
@@ -0,0 +1,60 @@
+"""
+Measures how long ``import trackhub`` takes in a fresh interpreter.
+
+Usage::
+
+    python benchmarks/import_time.py [repeats]
+
+Each repeat runs ``python -X importtime -c "import trackhub"`` in a new
+process. The median total time is reported along with the slowest modules
+(by cumulative time) from the median run.
+"""
+
+import os
+import sys
+import subprocess
+
+
+def import_times():
+    """
+    Returns a list of (cumulative microseconds, module) for one import of
+    trackhub, as reported by ``-X importtime``.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import trackhub"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        env=env,
+        check=True,
+    )
+    times = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        times.append((int(cumulative), module.rstrip()))
+    return times
+
+
+def main(repeats):
+    # The first run may include compiling to bytecode
+    import_times()
+    runs = sorted(
+        (import_times() for _ in range(repeats)),
+        key=lambda times: times[-1][0],
+    )
+    median = runs[len(runs) // 2]
+    print(
+        "import trackhub: {0:.1f} ms (median of {1})".format(
+            median[-1][0] / 1000.0, repeats
+        )
+    )
+    for cumulative, module in sorted(median, reverse=True)[1:11]:
+        print("{0:>8.1f} ms  {1}".format(cumulative / 1000.0, module))
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 11
+    main(repeats)
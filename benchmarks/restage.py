@@ -0,0 +1,67 @@
+"""
+Measures staging a hub into a persistent staging directory, and staging it
+again when nothing has changed.
+
+Usage::
+
+    python benchmarks/restage.py [ntracks]
+
+Each track gets its own (empty) source file. The hub is staged with
+``incremental=True`` three times: once into an empty directory, again with the
+same objects, and again with a newly-built but identical hub, as a separate
+run of a pipeline would.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import trackhub
+from trackhub import upload
+
+
+def build(n, data_dir):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    trackdb.add_tracks(
+        [
+            trackhub.Track(
+                name="sample%d" % i,
+                tracktype="bigWig",
+                source=os.path.join(data_dir, "sample%d.bw" % i),
+                color="128,0,0",
+            )
+            for i in range(n)
+        ]
+    )
+    return hub
+
+
+def main(n):
+    data_dir = tempfile.mkdtemp()
+    staging = tempfile.mkdtemp()
+    try:
+        for i in range(n):
+            open(os.path.join(data_dir, "sample%d.bw" % i), "w").close()
+
+        hub = build(n, data_dir)
+        for label in ["first staging", "unchanged", "unchanged, new hub"]:
+            if label == "unchanged, new hub":
+                hub = build(n, data_dir)
+            t0 = time.time()
+            _, changed = upload.stage_hub(hub, staging, incremental=True)
+            print(
+                "{0:<20}{1:>8.2f}s {2:>8} files changed".format(
+                    label, time.time() - t0, len(changed)
+                )
+            )
+    finally:
+        shutil.rmtree(data_dir)
+        shutil.rmtree(staging)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    main(n)
@@ -0,0 +1,87 @@
+"""
+Measures staging a hub with different numbers of staging worker threads, and
+reports the time spent in each phase.
+
+Usage::
+
+    python benchmarks/stage_workers.py [ntracks] [data_dir]
+
+Each track gets its own (empty) source file, spread over 100 subdirectories of
+`data_dir` (default a new temporary directory). Pointing `data_dir` at a
+network filesystem shows the benefit of more workers best; on a local disk the
+calls are fast enough that the thread pool makes little difference.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from collections import OrderedDict
+import trackhub
+from trackhub import upload
+
+
+def build(n, data_dir):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    for i in range(n):
+        source = os.path.join(data_dir, "d%d" % (i % 100), "sample%d.bw" % i)
+        trackdb.add_tracks(
+            trackhub.Track(
+                name="sample%d" % i,
+                tracktype="bigWig",
+                source=source,
+                filename="d%d/sample%d.bw" % (i % 100, i),
+            )
+        )
+    return hub
+
+
+def main(n, data_dir=None):
+    cleanup = data_dir is None
+    if cleanup:
+        data_dir = tempfile.mkdtemp()
+    try:
+        for i in range(n):
+            dirname = os.path.join(data_dir, "d%d" % (i % 100))
+            if not os.path.exists(dirname):
+                os.makedirs(dirname)
+            open(os.path.join(dirname, "sample%d.bw" % i), "w").close()
+
+        for workers in [1, 8]:
+            for incremental in [False, True]:
+                hub = build(n, data_dir)
+                staging = tempfile.mkdtemp()
+                timings = OrderedDict()
+                try:
+                    t0 = time.time()
+                    upload.stage_hub(
+                        hub,
+                        staging,
+                        incremental=incremental,
+                        workers=workers,
+                        timings=timings,
+                    )
+                    elapsed = time.time() - t0
+                finally:
+                    shutil.rmtree(staging)
+                print(
+                    "workers={0} incremental={1!s:<6}{2:>7.2f}s  {3}".format(
+                        workers,
+                        incremental,
+                        elapsed,
+                        " ".join(
+                            "{0}={1:.2f}".format(k, v) for k, v in timings.items()
+                        ),
+                    )
+                )
+    finally:
+        if cleanup:
+            shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 20000, *args[1:])
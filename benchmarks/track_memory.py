@@ -0,0 +1,53 @@
+"""
+Measures the memory used per track object.
+
+Usage::
+
+    python benchmarks/track_memory.py [ntracks]
+
+Tracks are built the way a typical per-sample hub would build them (a handful
+of parameters each) and attached to a TrackDb, and the memory allocated while
+doing so is divided by the number of tracks.
+"""
+
+import sys
+import gc
+import tracemalloc
+import trackhub
+
+
+def build(n):
+    trackdb = trackhub.TrackDb()
+    tracks = []
+    for i in range(n):
+        tracks.append(
+            trackhub.Track(
+                name="sample%d_plus" % i,
+                tracktype="bigWig",
+                source="sample%d_plus.bw" % i,
+                color="128,0,0",
+                visibility="full",
+                maxHeightPixels="8:50:128",
+            )
+        )
+    trackdb.add_tracks(tracks)
+    return trackdb
+
+
+def main(n):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    trackdb = build(n)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(
+        "{0} tracks: {1:.0f} bytes per track".format(n, (after - before) / float(n))
+    )
+    return trackdb
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    main(n)
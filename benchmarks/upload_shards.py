@@ -0,0 +1,72 @@
+"""
+Measures uploading a hub with different numbers of concurrent rsync processes,
+using a local directory as the remote.
+
+Usage::
+
+    python benchmarks/upload_shards.py [ntracks] [mb_per_track] [remote_dir]
+
+Each track gets its own source file of random data. Uploading to a local
+directory (the default is a new temporary directory) is limited by the disk
+rather than the network, so this mostly checks the overhead of sharding; point
+`remote_dir` at a mounted network filesystem to see the benefit of more
+processes.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import trackhub
+from trackhub import upload
+
+
+def build(n, data_dir):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    trackdb.add_tracks(
+        [
+            trackhub.Track(
+                name="sample%d" % i,
+                tracktype="bigWig",
+                source=os.path.join(data_dir, "sample%d.bw" % i),
+            )
+            for i in range(n)
+        ]
+    )
+    return hub
+
+
+def main(n, mb, remote_dir=None):
+    data_dir = tempfile.mkdtemp()
+    cleanup = remote_dir is None
+    if cleanup:
+        remote_dir = tempfile.mkdtemp()
+    try:
+        for i in range(n):
+            with open(os.path.join(data_dir, "sample%d.bw" % i), "wb") as fout:
+                fout.write(os.urandom(int(mb * 1024 * 1024)))
+
+        hub = build(n, data_dir)
+        for jobs in [1, 2, 4, 8]:
+            remote = os.path.join(remote_dir, "jobs%d" % jobs)
+            t0 = time.time()
+            upload.upload_hub(
+                hub, None, remote, rsync_options="-rL", jobs=jobs
+            )
+            print("jobs={0:<3}{1:>8.2f}s".format(jobs, time.time() - t0))
+    finally:
+        shutil.rmtree(data_dir)
+        if cleanup:
+            shutil.rmtree(remote_dir)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if args else 200,
+        float(args[1]) if len(args) > 1 else 5,
+        *args[2:]
+    )
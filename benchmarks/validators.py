@@ -0,0 +1,55 @@
+"""
+Compares the fast paths of the structured-format validators with the original
+checks they fall back to.
+
+Usage::
+
+    python benchmarks/validators.py [repeats]
+
+For each validator, a typical valid value is checked `repeats` times with the
+original function alone (as validators worked before the fast paths were
+added) and with the validator itself. The validation cache is not involved.
+"""
+
+import sys
+import timeit
+from trackhub import validate
+
+VALUES = [
+    ("RGB", "128,0,255"),
+    ("RGBList", "128,0,0 90,90,5"),
+    ("alphanumeric_", "sample1234_plus_strand"),
+    ("hex_or_named", "#FF0000"),
+]
+
+
+def original(func):
+    def check(v):
+        try:
+            return func(v)
+        except Exception:
+            return False
+
+    return check
+
+
+def main(repeats):
+    print("{0:<34}{1:>12}{2:>12}{3:>9}".format("validator", "original", "fast", "speedup"))
+    for name, value in VALUES:
+        v = getattr(validate, name)
+        slow = original(v._func)
+        t_slow = timeit.timeit(lambda: slow(value), number=repeats)
+        t_fast = timeit.timeit(lambda: v(value), number=repeats)
+        print(
+            "{0:<34}{1:>10.2f}us{2:>10.2f}us{3:>8.1f}x".format(
+                name,
+                t_slow / repeats * 1e6,
+                t_fast / repeats * 1e6,
+                t_slow / t_fast,
+            )
+        )
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    main(repeats)
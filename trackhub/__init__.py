@@ -5,7 +5,6 @@ from . import track
 from . import settings
 from .hub import Hub
 from . import helpers
-from . import upload
 from .genomes_file import GenomesFile
 from .genome import Genome
 from .assembly import Assembly
@@ -23,6 +22,16 @@ from .track import (
 from .version import version as __version__
 
 
+def __getattr__(name):
+    # The upload machinery is only needed when a hub is uploaded, so
+    # trackhub.upload is imported on first use.
+    if name == "upload":
+        import importlib
+
+        return importlib.import_module(".upload", __name__)
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
 def default_hub(
     hub_name, genome, email, short_label=None, long_label=None, defaultPos=None
 ):
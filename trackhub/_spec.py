@@ -0,0 +1,1778 @@
+# Generated from parsed_params.py by `python -m trackhub.spec`; do not edit.
+#
+# PARAMS holds (name, fmt, types, required, validator id) for each parameter;
+# see trackhub/spec.py for validator ids. TRACK_FIELDS holds the parameter
+# names valid for each track type, in order.
+
+VERSION = 1
+
+TRACKTYPES = ("all", "bam", "bigBarChart", "bigBed", "bigChain", "bigGenePred", "bigInteract", "bigLolly", "bigMaf", "bigNarrowPeak", "bigPsl", "bigWig", "compositeTrack", "halSnake", "hic", "multiWig", "subGroups", "superTrack", "vcfPhasedTrio", "vcfTabix", "view", "assembly", "genome")
+
+DATA_TRACKTYPES = ("bam", "bigBarChart", "bigBed", "bigChain", "bigInteract", "bigLolly", "bigMaf", "bigPsl", "bigWig", "hic", "vcfPhasedTrio", "vcfTabix")
+
+PARAMS = (
+    (
+        "aggregate",
+        ["aggregate <transparentOverlay/stacked/solidOverlay/none>"],
+        ("multiWig",),
+        False,
+        ("set", ("none", "solidOverlay", "stacked", "transparentOverlay")),
+    ),
+    (
+        "aliQualRange",
+        ["bamGrayMode <aliQual/baseQual/unpaired>", "aliQualRange <min:max>", "baseQualRange <min:max>"],
+        ("bam",),
+        False,
+        ("validate", "ColSV2"),
+    ),
+    (
+        "allButtonPair",
+        ["allButtonPair on"],
+        ("compositeTrack",),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "altColor",
+        ["altColor <red,green,blue>"],
+        ("all",),
+        False,
+        ("validate", "RGB"),
+    ),
+    (
+        "alwaysZero",
+        ["alwaysZero  <off/on>"],
+        ("bigWig",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "autoScale",
+        ["autoScale <off/on/group>"],
+        ("bigWig", "hic", "compositeTrack"),
+        False,
+        ("set", ("group", "off", "on")),
+    ),
+    (
+        "bamColorMode",
+        ["bamColorMode <strand/gray/tag/off>"],
+        ("bam",),
+        False,
+        ("set", ("gray", "off", "strand", "tag")),
+    ),
+    (
+        "bamColorTag",
+        ["bamColorTag <XX>"],
+        ("bam",),
+        False,
+        ("str",),
+    ),
+    (
+        "bamGrayMode",
+        ["bamGrayMode <aliQual/baseQual/unpaired>", "aliQualRange <min:max>", "baseQualRange <min:max>"],
+        ("bam",),
+        False,
+        ("set", ("aliQual", "baseQual", "unpaired")),
+    ),
+    (
+        "bamSkipPrintQualScore",
+        ["bamSkipPrintQualScore ."],
+        ("bam",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartBarMinPadding",
+        ["barChartBarMinPadding <num>"],
+        ("bigBarChart",),
+        False,
+        ("float",),
+    ),
+    (
+        "barChartBarMinWidth",
+        ["barChartBarMinWidth <num>"],
+        ("bigBarChart",),
+        False,
+        ("float",),
+    ),
+    (
+        "barChartBars",
+        ["barChartBars <label1 label2...>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartCategoryUrl",
+        ["barChartCategoryUrl <url>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartColors",
+        ["barChartColors <color1 color2...>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartFacets",
+        ["barChartFacets <column1,column2,...columnN>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartLabel",
+        ["barChartLabel <label>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartMatrixUrl",
+        ["barChartMatrixUrl <url>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartMaxSize",
+        ["barChartMaxSize <small/medium/large>"],
+        ("bigBarChart",),
+        False,
+        ("set", ("large", "medium", "small")),
+    ),
+    (
+        "barChartMerge",
+        ["barChartMerge on"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartMetric",
+        ["barChartMetric <metric>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartSampleUrl",
+        ["barChartSampleUrl <url>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartSizeWindows",
+        ["barChartSizeWindows <largeMax> <smallMin>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartStatsUrl",
+        ["barChartStatsUrl <url>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartStretchToItem",
+        ["barChartStretchToItem on"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "barChartUnit",
+        ["barChartUnit <unit>"],
+        ("bigBarChart",),
+        False,
+        ("str",),
+    ),
+    (
+        "baseColorDefault",
+        ["baseColorDefault\n                    <diffBases/diffCodons/itemBases/itemCodons/genomicCodons>"],
+        ("all",),
+        False,
+        ("set", ("diffBases", "diffCodons", "genomicCodons", "itemBases", "itemCodons")),
+    ),
+    (
+        "baseColorUseCds",
+        ["baseColorUseCds <given>"],
+        ("bigPsl",),
+        False,
+        ("str",),
+    ),
+    (
+        "baseColorUseSequence",
+        ["baseColorUseSequence  <extFile {seqTable} /\n                  hgPcrResult / lfExtra / nameIsSequence / seq1Seq2 / ss / 2bit >"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "baseQualRange",
+        ["bamGrayMode <aliQual/baseQual/unpaired>", "aliQualRange <min:max>", "baseQualRange <min:max>"],
+        ("bam",),
+        False,
+        ("validate", "ColSV2"),
+    ),
+    (
+        "bedNameLabel",
+        ["bedNameLabel <label>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "bigDataIndex",
+        ["bigDataIndex <url/relativePath>"],
+        ("bam", "vcfPhasedTrio", "vcfTabix"),
+        False,
+        ("str",),
+    ),
+    (
+        "bigDataUrl",
+        ["bigDataUrl <url/relativePath>"],
+        ("bam", "bigBarChart", "bigBed", "bigChain", "bigInteract", "bigLolly", "bigMaf", "bigPsl", "bigWig", "hic", "vcfPhasedTrio", "vcfTabix"),
+        True,
+        ("str",),
+    ),
+    (
+        "bigDataUrl2",
+        ["bigDataUrl2 <url/relativePath>"],
+        ("bam", "bigBed", "bigWig", "vcfTabix"),
+        False,
+        ("str",),
+    ),
+    (
+        "boxedCfg",
+        ["boxedCfg <on/off>"],
+        ("all",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "centerLabelsDense",
+        ["centerLabelsDense <off/on>"],
+        ("compositeTrack",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "chromosomes",
+        ["chromosomes <chr1,chr2,...>"],
+        ("all",),
+        False,
+        ("validate", "CSV"),
+    ),
+    (
+        "color",
+        ["color <red,green,blue>"],
+        ("all",),
+        False,
+        ("validate", "RGB"),
+    ),
+    (
+        "colorByStrand",
+        ["colorByStrand <red,green,blue> <red,green,blue>"],
+        ("bigBed",),
+        False,
+        ("validate", "RGBList"),
+    ),
+    (
+        "compositeTrack",
+        ["compositeTrack on"],
+        ("compositeTrack",),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "configurable",
+        ["configurable <off/on>"],
+        ("view",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "container",
+        ["container multiWig"],
+        ("multiWig",),
+        False,
+        ("set", ("multiWig",)),
+    ),
+    (
+        "darkerLabels",
+        ["darkerLabels on"],
+        ("all",),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "dataVersion",
+        ["dataVersion <str>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "decorator",
+        ["decorator.default.*"],
+        ("bigBed", "bigGenePred", "bigPsl"),
+        False,
+        ("str",),
+    ),
+    (
+        "defaultLabelFields",
+        ["defaultLabelFields <fieldName[,fieldName]>"],
+        ("bigBarChart", "bigBed", "bigGenePred", "bigNarrowPeak", "bigPsl"),
+        False,
+        ("str",),
+    ),
+    (
+        "denseCoverage",
+        ["denseCoverage <maxVal>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "detailsDynamicTable",
+        ["detailsDynamicTable <fieldName1|table title,fieldName2|table title,...>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "detailsStaticTable",
+        ["detailsStaticTable <url/relativePath>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "dimensionAchecked",
+        ["dimension<?>checked <mTag1a>\n                                [mTag1b \u2026]"],
+        ("subGroups",),
+        False,
+        ("str",),
+    ),
+    (
+        "dimensions",
+        ["dimensions <dimX=gTag#> [dimY=gTag#] [dimA=gTag# ...]"],
+        ("subGroups",),
+        False,
+        ("validate", "key_val"),
+    ),
+    (
+        "directUrl",
+        ["directUrl <url>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "directUrl_for_hubs",
+        ["directUrl <url>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "doWiggle",
+        ["doWiggle on"],
+        ("bam",),
+        False,
+        ("str",),
+    ),
+    (
+        "downloadUrl",
+        ["downloadUrl <label> <URL>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "dragAndDrop",
+        ["dragAndDrop subTracks"],
+        ("compositeTrack",),
+        False,
+        ("str",),
+    ),
+    (
+        "drawMode",
+        ["drawMode <triangle|square|arc>"],
+        ("hic",),
+        False,
+        ("set", ("arc", "square", "triangle")),
+    ),
+    (
+        "exonNumbers",
+        ["exonNumbers <on/off>"],
+        ("bigBed", "bigGenePred"),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "extraDetailsTable",
+        ["extraDetailsTable <url/relativePath>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "extraTableFields",
+        ["extraTableFields <fieldName1|table title,fieldName2|table title,...>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filter",
+        ["filter.<fieldName> <default integer>", "filterByRange.<fieldName> <off/on>", "filterLimits.<fieldName> <low>[:<high>]"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filter.<fieldName>",
+        ["filter.<fieldName> <default integer>", "filterByRange.<fieldName> <off/on>", "filterLimits.<fieldName> <low>[:<high>]"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filterByRange.<fieldName>",
+        ["filter.<fieldName> <default integer>", "filterByRange.<fieldName> <off/on>", "filterLimits.<fieldName> <low>[:<high>]"],
+        ("bigBed",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "filterComposite",
+        ["filterComposite <dim[A/B/C][=one]> [dimB dimC ...]"],
+        ("subGroups",),
+        False,
+        ("str",),
+    ),
+    (
+        "filterLabel",
+        ["filterLabel.<fieldName> <label>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filterLimits.<fieldName>",
+        ["filter.<fieldName> <default integer>", "filterByRange.<fieldName> <off/on>", "filterLimits.<fieldName> <low>[:<high>]"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filterText",
+        ["filterText.<fieldName> <default search string>", "filterType.<fieldName> <wildcard/regexp>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filterText.<fieldName>",
+        ["filterText.<fieldName> <default search string>", "filterType.<fieldName> <wildcard/regexp>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filterType.<fieldName>",
+        ["filterValues.<fieldName> <value1,value2,value3...>", "filterValuesDefault.<fieldName> <value1,value2,value3...>", "filterType.<fieldName> <single/singleList/multiple/multipleListOr/multipleListAnd/multipleListOnlyOr/multipleListOnlyAnd>"],
+        ("bigBed",),
+        False,
+        ("set", ("multiple", "multipleListAnd", "multipleListOnlyAnd", "multipleListOnlyOr", "multipleListOr", "single", "singleList")),
+    ),
+    (
+        "filterValues",
+        ["filterValues.<fieldName> <value1,value2,value3...>", "filterValuesDefault.<fieldName> <value1,value2,value3...>", "filterType.<fieldName> <single/singleList/multiple/multipleListOr/multipleListAnd/multipleListOnlyOr/multipleListOnlyAnd>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filterValues.<fieldName>",
+        ["filterValues.<fieldName> <value1,value2,value3...>", "filterValuesDefault.<fieldName> <value1,value2,value3...>", "filterType.<fieldName> <single/singleList/multiple/multipleListOr/multipleListAnd/multipleListOnlyOr/multipleListOnlyAnd>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "filterValuesDefault.<fieldName>",
+        ["filterValues.<fieldName> <value1,value2,value3...>", "filterValuesDefault.<fieldName> <value1,value2,value3...>", "filterType.<fieldName> <single/singleList/multiple/multipleListOr/multipleListAnd/multipleListOnlyOr/multipleListOnlyAnd>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "frames",
+        ["frames <table/url>"],
+        ("bigMaf",),
+        False,
+        ("str",),
+    ),
+    (
+        "geneTrack",
+        ["geneTrack <track>"],
+        ("vcfPhasedTrio",),
+        False,
+        ("str",),
+    ),
+    (
+        "graphTypeDefault",
+        ["graphTypeDefault points"],
+        ("bigWig",),
+        False,
+        ("set", ("bar", "points")),
+    ),
+    (
+        "gridDefault",
+        ["yLineMark <#>", "yLineOnOff <off/on>", "gridDefault   on"],
+        ("bigWig",),
+        False,
+        ("str",),
+    ),
+    (
+        "hicDistanceMax",
+        ["hicDistanceMax <integer>"],
+        ("hic",),
+        False,
+        ("int",),
+    ),
+    (
+        "hicDistanceMin",
+        ["hicDistanceMin <integer>"],
+        ("hic",),
+        False,
+        ("int",),
+    ),
+    (
+        "hideEmptySubtracks",
+        ["hideEmptySubtracks <on/off>"],
+        ("compositeTrack",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "hideEmptySubtracksLabel",
+        ["hideEmptySubtracksLabel <label>"],
+        ("compositeTrack",),
+        False,
+        ("str",),
+    ),
+    (
+        "hideEmptySubtracksMultiBedUrl",
+        ["hideEmptySubtracksMultiBedUrl file.bb"],
+        ("compositeTrack",),
+        False,
+        ("str",),
+    ),
+    (
+        "hideEmptySubtracksSourcesUrl",
+        ["hideEmptySubtracksSourcesUrl file.tab"],
+        ("compositeTrack",),
+        False,
+        ("str",),
+    ),
+    (
+        "html",
+        ["html"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "idInUrlSql",
+        ["url <url>", "urlLabel <label>", "idInUrlSql <sql for id>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "iframeOptions",
+        ["iframeOptions <string>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "iframeUrl",
+        ["iframeUrl <url>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "indelDoubleInsert",
+        ["indelDoubleInsert <off/on>", "indelQueryInsert <off/on>", "indelPolyA <off/on>"],
+        ("bam",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "indelPolyA",
+        ["indelDoubleInsert <off/on>", "indelQueryInsert <off/on>", "indelPolyA <off/on>"],
+        ("bam",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "indelQueryInsert",
+        ["indelDoubleInsert <off/on>", "indelQueryInsert <off/on>", "indelPolyA <off/on>"],
+        ("bam",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "interactDirectional",
+        ["interactDirectional <true|offsetSource|offsetTarget|clusterSource|clusterTarget>"],
+        ("bigInteract",),
+        False,
+        ("set", ("clusterSource", "clusterTarget", "offsetSource", "offsetTarget", "true")),
+    ),
+    (
+        "interactMultiRegion",
+        ["interactMultiRegion <true|padding>"],
+        ("bigInteract",),
+        False,
+        ("str",),
+    ),
+    (
+        "interactUp",
+        ["interactUp <true|false>"],
+        ("bigInteract",),
+        False,
+        ("set", ("false", "true")),
+    ),
+    (
+        "itemRgb",
+        ["itemRgb on"],
+        ("bigBed",),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "labelFields",
+        ["labelFields <fieldName[,fieldName]>"],
+        ("bigBarChart", "bigBed", "bigGenePred", "bigNarrowPeak", "bigPsl"),
+        False,
+        ("validate", "CSV"),
+    ),
+    (
+        "labelOnFeature",
+        ["labelOnFeature <on/off>"],
+        ("bigBed",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "labelSeparator",
+        ["labelSeparator <text>"],
+        ("bigBed", "bigGenePred", "bigNarrowPeak", "bigPsl"),
+        False,
+        ("str",),
+    ),
+    (
+        "linkDataUrl",
+        ["linkDataUrl <url/relativePath>"],
+        ("bigChain",),
+        ["bigChain"],
+        ("str",),
+    ),
+    (
+        "linkIdInName",
+        ["linkIdInName on"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "logo",
+        ["logo on"],
+        ("bigWig",),
+        False,
+        ("str",),
+    ),
+    (
+        "lollyField",
+        ["lollyField <integer>"],
+        ("bigLolly",),
+        False,
+        ("int",),
+    ),
+    (
+        "lollyMaxSize",
+        ["lollyMaxSize <integer>"],
+        ("bigLolly",),
+        False,
+        ("int",),
+    ),
+    (
+        "lollySizeField",
+        ["lollySizeField <integer>"],
+        ("bigLolly",),
+        False,
+        ("int",),
+    ),
+    (
+        "longLabel",
+        ["longLabel"],
+        ("all",),
+        True,
+        ("validate", "long_label"),
+    ),
+    (
+        "maxHeightPixels",
+        ["maxHeightPixels <max:default:min>"],
+        ("bigInteract", "bigWig"),
+        False,
+        ("validate", "ColSV3"),
+    ),
+    (
+        "maxItems",
+        ["maxItems <integer>"],
+        ("bigBed",),
+        False,
+        ("int",),
+    ),
+    (
+        "maxLimit",
+        ["maxLimit <#>"],
+        ("bigBarChart",),
+        False,
+        ("float",),
+    ),
+    (
+        "maxWindowCoverage",
+        ["maxWindowCoverage <integer>"],
+        ("bam", "bigWig"),
+        False,
+        ("int",),
+    ),
+    (
+        "maxWindowToDraw",
+        ["maxWindowToDraw <integer>"],
+        ("bam", "bigWig"),
+        False,
+        ("int",),
+    ),
+    (
+        "maxWindowToQuery",
+        ["maxWindowToQuery <integer>"],
+        ("bigWig",),
+        False,
+        ("int",),
+    ),
+    (
+        "mergeSpannedItems",
+        ["mergeSpannedItems <on/off>"],
+        ("bigBed",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "meta",
+        ["meta"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "minAliQual",
+        ["minAliQual <#>"],
+        ("bam",),
+        False,
+        ("int",),
+    ),
+    (
+        "minGrayLevel",
+        ["minGrayLevel  <1-9>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "mouseOver",
+        ["mouseOver <pattern>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "mouseOverField",
+        ["mouseOverField <fieldName1>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "mouseOverFunction",
+        ["mouseOverFunction <noAverage>"],
+        ("bigWig",),
+        False,
+        ("str",),
+    ),
+    (
+        "multiRegionsBedUrl",
+        ["multiRegionsBedUrl <url/relativePath>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "negateValues",
+        ["negateValues <on>"],
+        ("bigWig",),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "nextExonText",
+        ["nextExonText <str>", "prevExonText <str>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "noColorTag",
+        ["noColorTag ."],
+        ("bam",),
+        False,
+        ("str",),
+    ),
+    (
+        "noStems",
+        ["noStems <on/off>"],
+        ("bigLolly",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "normalization",
+        ["normalization <NONE|VC|VC_SQRT|KR>"],
+        ("hic",),
+        False,
+        ("set", ("KR", "NONE", "VC", "VC_SQRT")),
+    ),
+    (
+        "otherDb",
+        ["otherDb <otherDb>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "otherSpecies",
+        ["otherSpecies <otherSpecies>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "otherTwoBitUrl",
+        ["otherTwoBitUrl <url/relativePath>"],
+        ("bigChain", "bigPsl"),
+        False,
+        ("str",),
+    ),
+    (
+        "pairEndsByName",
+        ["pairEndsByName ."],
+        ("bam",),
+        False,
+        ("set", (".",)),
+    ),
+    (
+        "pairSearchRange",
+        ["pairSearchRange <#>"],
+        ("bam",),
+        False,
+        ("int",),
+    ),
+    (
+        "parent",
+        ["parent <composite> [off/on]", "parent <containerTrack>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "pennantIcon",
+        ["pennantIcon <iconFile>/<text color> [html [tip]] \n[; <iconFile>/<text color> [html [tip]]]"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "prevExonText",
+        ["nextExonText <str>", "prevExonText <str>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "priority",
+        ["priority <float>"],
+        ("all",),
+        False,
+        ("float",),
+    ),
+    (
+        "refUrl",
+        ["refUrl <url>/%s"],
+        ("bam",),
+        False,
+        ("str",),
+    ),
+    (
+        "resolution",
+        ["resolution <Auto|integer>"],
+        ("hic",),
+        False,
+        ("str",),
+    ),
+    (
+        "saturationScore",
+        ["saturationScore <float>"],
+        ("hic",),
+        False,
+        ("float",),
+    ),
+    (
+        "scoreFilter",
+        ["scoreFilter <low>[:<high>]", "scoreFilterLimits <low>[:<high>]"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "scoreFilterLimits",
+        ["scoreFilter <low>[:<high>]", "scoreFilterLimits <low>[:<high>]"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "scoreLabel",
+        ["scoreLabel <label>"],
+        ("bigBed", "bigGenePred", "bigNarrowPeak", "bigPsl"),
+        False,
+        ("str",),
+    ),
+    (
+        "scoreMax",
+        ["spectrum on", "scoreMax <integer>", "scoreMin <integer>"],
+        ("all",),
+        False,
+        ("int",),
+    ),
+    (
+        "scoreMin",
+        ["spectrum on", "scoreMax <integer>", "scoreMin <integer>"],
+        ("all",),
+        False,
+        ("int",),
+    ),
+    (
+        "searchIndex",
+        ["searchIndex <str>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "searchTrix",
+        ["searchTrix <url/relativePath>"],
+        ("bigBed",),
+        False,
+        ("str",),
+    ),
+    (
+        "sepFields",
+        ["sepFields fieldName1,fieldName2 ..."],
+        ("bigBed", "bigChain", "bigGenePred", "bigMaf", "bigNarrowPeak", "bigPsl"),
+        False,
+        ("validate", "key_val"),
+    ),
+    (
+        "shortLabel",
+        ["shortLabel"],
+        ("all",),
+        True,
+        ("validate", "short_label"),
+    ),
+    (
+        "showDiffBasesAllScales",
+        ["showDiffBasesAllScales on"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "showDiffBasesMaxZoom",
+        ["showDiffBasesMaxZoom <basesPerPixel>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "showNames",
+        ["showNames <on/off>"],
+        ("bam",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "showSnpWidth",
+        ["showSnpWidth <integer>"],
+        ("halSnake",),
+        False,
+        ("int",),
+    ),
+    (
+        "showSubtrackColorOnUi",
+        ["showSubtrackColorOnUi on"],
+        ("multiWig",),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "skipEmptyFields",
+        ["skipEmptyFields on"],
+        ("bigBed", "bigChain", "bigGenePred", "bigMaf", "bigNarrowPeak", "bigPsl"),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "skipFields",
+        ["skipFields <fieldName1>=\"<url1>\" <fieldName2>=\"<url2>\" ..."],
+        ("bigBed", "bigChain", "bigGenePred", "bigMaf", "bigNarrowPeak", "bigPsl"),
+        False,
+        ("validate", "key_val"),
+    ),
+    (
+        "smoothingWindow",
+        ["smoothingWindow <off/1-16>"],
+        ("bigWig",),
+        False,
+        ("str",),
+    ),
+    (
+        "sortOrder",
+        ["sortOrder <gTag#=+/-> [gTag#=- \u2026]"],
+        ("subGroups",),
+        False,
+        ("validate", "key_val"),
+    ),
+    (
+        "spectrum",
+        ["spectrum on", "scoreMax <integer>", "scoreMin <integer>"],
+        ("all",),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "subGroups",
+        ["subGroups <gTag1=mTag1?> [gTag2= mTag2?]"],
+        ("subGroups",),
+        False,
+        ("validate", "key_val"),
+    ),
+    (
+        "summary",
+        ["summary <tableName/url>"],
+        ("bigMaf",),
+        False,
+        ("str",),
+    ),
+    (
+        "superTrack",
+        ["superTrack on show"],
+        ("superTrack",),
+        False,
+        ("str",),
+    ),
+    (
+        "tableBrowser",
+        ["tableBrowser <off/on/noGenome/tbNoGenome> [table1 ...]"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "thickDrawItem",
+        ["thickDrawItem <off/on>"],
+        ("bigBed",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "track",
+        ["track"],
+        ("all",),
+        True,
+        ("str",),
+    ),
+    (
+        "transformFunc",
+        ["transformFunc <NONE/LOG>"],
+        ("bigWig",),
+        False,
+        ("set", ("LOG", "NONE")),
+    ),
+    (
+        "url",
+        ["url <url>", "urlLabel <label>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "urlLabel",
+        ["url <url>", "urlLabel <label>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "url_for_hubs",
+        ["url <url>", "urlLabel <label>"],
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "urls",
+        ["urls <fieldName1>=\"<url1>\" <fieldName2>=\"<url2>\" ..."],
+        ("bigBarChart", "bigBed"),
+        False,
+        ("str",),
+    ),
+    (
+        "vcfChildSample",
+        ["vcfChildSample <sampleName|altName>"],
+        ("vcfPhasedTrio",),
+        False,
+        ("str",),
+    ),
+    (
+        "vcfDoFilter",
+        ["vcfDoFilter <on/off>"],
+        ("vcfPhasedTrio", "vcfTabix"),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "vcfDoMaf",
+        ["vcfDoMaf <on/off>"],
+        ("vcfPhasedTrio", "vcfTabix"),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "vcfDoQual",
+        ["vcfDoQual <on/off>"],
+        ("vcfPhasedTrio", "vcfTabix"),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "vcfParentSamples",
+        ["vcfParentSamples <sampleName|altName,sampleName|altName>"],
+        ("vcfPhasedTrio",),
+        False,
+        ("str",),
+    ),
+    (
+        "vcfUseAltSampleNames",
+        ["vcfUseAltSampleNames <on/off>"],
+        ("vcfPhasedTrio",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "view",
+        "view <viewName>",
+        ("view",),
+        False,
+        ("str",),
+    ),
+    (
+        "viewLimits",
+        ["viewLimits <lower:upper>", "viewLimitsMax <lower:upper>"],
+        ("bigWig",),
+        False,
+        ("validate", "ColSV2"),
+    ),
+    (
+        "viewLimitsMax",
+        ["viewLimits <lower:upper>", "viewLimitsMax <lower:upper>"],
+        ("bigWig",),
+        False,
+        ("validate", "ColSV2"),
+    ),
+    (
+        "viewUi",
+        ["viewUi on"],
+        ("view",),
+        False,
+        ("set", ("on",)),
+    ),
+    (
+        "visibility",
+        ["visibility"],
+        ("all",),
+        False,
+        ("set", ("dense", "full", "hide", "pack", "squish")),
+    ),
+    (
+        "windowingFunction",
+        ["windowingFunction  <mean/mean+whiskers/maximum/minimum>"],
+        ("bigWig",),
+        False,
+        ("set", ("maximum", "mean", "mean+whiskers", "minimum")),
+    ),
+    (
+        "yAxisLabel",
+        ["yAxisLabel.<integer> <integer> <on/off> <R,G,B> <string> "],
+        ("bigLolly",),
+        False,
+        ("str",),
+    ),
+    (
+        "yAxisNumLabels",
+        ["yAxisNumLabels.<on/off> <integer>"],
+        ("bigLolly",),
+        False,
+        ("str",),
+    ),
+    (
+        "yLineMark",
+        ["yLineMark <#>", "yLineOnOff <off/on>", "gridDefault   on"],
+        ("bigWig",),
+        False,
+        ("float",),
+    ),
+    (
+        "yLineOnOff",
+        ["yLineMark <#>", "yLineOnOff <off/on>", "gridDefault   on"],
+        ("bigWig",),
+        False,
+        ("set", ("off", "on")),
+    ),
+    (
+        "description",
+        "",
+        ("all",),
+        False,
+        ("str",),
+    ),
+    (
+        "organism",
+        "",
+        ("assembly",),
+        False,
+        ("str",),
+    ),
+    (
+        "scientificName",
+        "",
+        ("assembly",),
+        False,
+        ("str",),
+    ),
+    (
+        "orderKey",
+        "",
+        ("assembly",),
+        False,
+        ("str",),
+    ),
+    (
+        "defaultPos",
+        "",
+        ("all", "assembly", "genome"),
+        False,
+        ("validate", "ucsc_position"),
+    ),
+    (
+        "type",
+        "",
+        ("all", "bam", "bigBarChart", "bigBed", "bigChain", "bigGenePred", "bigInteract", "bigLolly", "bigMaf", "bigNarrowPeak", "bigPsl", "bigWig", "compositeTrack", "halSnake", "hic", "multiWig", "subGroups", "superTrack", "vcfPhasedTrio", "vcfTabix", "view", "assembly", "genome"),
+        True,
+        ("validate", "tracktypes"),
+    ),
+    (
+        "group",
+        "",
+        ("all", "bam", "bigBarChart", "bigBed", "bigChain", "bigGenePred", "bigInteract", "bigLolly", "bigMaf", "bigNarrowPeak", "bigPsl", "bigWig", "compositeTrack", "halSnake", "hic", "multiWig", "subGroups", "superTrack", "vcfPhasedTrio", "vcfTabix", "view", "assembly", "genome"),
+        False,
+        ("str",),
+    ),
+)
+
+TRACK_FIELDS = {
+    "all": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "altColor",
+        "baseColorDefault",
+        "baseColorUseSequence",
+        "boxedCfg",
+        "chromosomes",
+        "color",
+        "darkerLabels",
+        "dataVersion",
+        "directUrl",
+        "directUrl_for_hubs",
+        "downloadUrl",
+        "html",
+        "idInUrlSql",
+        "iframeOptions",
+        "iframeUrl",
+        "longLabel",
+        "meta",
+        "multiRegionsBedUrl",
+        "nextExonText",
+        "otherDb",
+        "otherSpecies",
+        "parent",
+        "pennantIcon",
+        "prevExonText",
+        "priority",
+        "scoreMax",
+        "scoreMin",
+        "shortLabel",
+        "showDiffBasesAllScales",
+        "showDiffBasesMaxZoom",
+        "spectrum",
+        "tableBrowser",
+        "track",
+        "url",
+        "urlLabel",
+        "url_for_hubs",
+        "visibility",
+        "description",
+        "defaultPos",
+        "type",
+        "group",
+    ),
+    "bam": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "aliQualRange",
+        "bamColorMode",
+        "bamColorTag",
+        "bamGrayMode",
+        "bamSkipPrintQualScore",
+        "baseQualRange",
+        "bigDataIndex",
+        "bigDataUrl",
+        "bigDataUrl2",
+        "doWiggle",
+        "indelDoubleInsert",
+        "indelPolyA",
+        "indelQueryInsert",
+        "maxWindowCoverage",
+        "maxWindowToDraw",
+        "minAliQual",
+        "noColorTag",
+        "pairEndsByName",
+        "pairSearchRange",
+        "refUrl",
+        "showNames",
+        "type",
+        "group",
+    ),
+    "bigBarChart": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "barChartBarMinPadding",
+        "barChartBarMinWidth",
+        "barChartBars",
+        "barChartCategoryUrl",
+        "barChartColors",
+        "barChartFacets",
+        "barChartLabel",
+        "barChartMatrixUrl",
+        "barChartMaxSize",
+        "barChartMerge",
+        "barChartMetric",
+        "barChartSampleUrl",
+        "barChartSizeWindows",
+        "barChartStatsUrl",
+        "barChartStretchToItem",
+        "barChartUnit",
+        "bigDataUrl",
+        "defaultLabelFields",
+        "labelFields",
+        "maxLimit",
+        "urls",
+        "type",
+        "group",
+    ),
+    "bigBed": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "bedNameLabel",
+        "bigDataUrl",
+        "bigDataUrl2",
+        "colorByStrand",
+        "decorator",
+        "defaultLabelFields",
+        "denseCoverage",
+        "detailsDynamicTable",
+        "detailsStaticTable",
+        "exonNumbers",
+        "extraDetailsTable",
+        "extraTableFields",
+        "filter",
+        "filter.<fieldName>",
+        "filterByRange.<fieldName>",
+        "filterLabel",
+        "filterLimits.<fieldName>",
+        "filterText",
+        "filterText.<fieldName>",
+        "filterType.<fieldName>",
+        "filterValues",
+        "filterValues.<fieldName>",
+        "filterValuesDefault.<fieldName>",
+        "itemRgb",
+        "labelFields",
+        "labelOnFeature",
+        "labelSeparator",
+        "linkIdInName",
+        "maxItems",
+        "mergeSpannedItems",
+        "minGrayLevel",
+        "mouseOver",
+        "mouseOverField",
+        "scoreFilter",
+        "scoreFilterLimits",
+        "scoreLabel",
+        "searchIndex",
+        "searchTrix",
+        "sepFields",
+        "skipEmptyFields",
+        "skipFields",
+        "thickDrawItem",
+        "urls",
+        "type",
+        "group",
+    ),
+    "bigChain": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "bigDataUrl",
+        "linkDataUrl",
+        "otherTwoBitUrl",
+        "sepFields",
+        "skipEmptyFields",
+        "skipFields",
+        "type",
+        "group",
+    ),
+    "bigGenePred": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "decorator",
+        "defaultLabelFields",
+        "exonNumbers",
+        "labelFields",
+        "labelSeparator",
+        "scoreLabel",
+        "sepFields",
+        "skipEmptyFields",
+        "skipFields",
+        "type",
+        "group",
+    ),
+    "bigInteract": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "bigDataUrl",
+        "interactDirectional",
+        "interactMultiRegion",
+        "interactUp",
+        "maxHeightPixels",
+        "type",
+        "group",
+    ),
+    "bigLolly": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "bigDataUrl",
+        "lollyField",
+        "lollyMaxSize",
+        "lollySizeField",
+        "noStems",
+        "yAxisLabel",
+        "yAxisNumLabels",
+        "type",
+        "group",
+    ),
+    "bigMaf": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "bigDataUrl",
+        "frames",
+        "sepFields",
+        "skipEmptyFields",
+        "skipFields",
+        "summary",
+        "type",
+        "group",
+    ),
+    "bigNarrowPeak": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "defaultLabelFields",
+        "labelFields",
+        "labelSeparator",
+        "scoreLabel",
+        "sepFields",
+        "skipEmptyFields",
+        "skipFields",
+        "type",
+        "group",
+    ),
+    "bigPsl": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "baseColorUseCds",
+        "bigDataUrl",
+        "decorator",
+        "defaultLabelFields",
+        "labelFields",
+        "labelSeparator",
+        "otherTwoBitUrl",
+        "scoreLabel",
+        "sepFields",
+        "skipEmptyFields",
+        "skipFields",
+        "type",
+        "group",
+    ),
+    "bigWig": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "alwaysZero",
+        "autoScale",
+        "bigDataUrl",
+        "bigDataUrl2",
+        "graphTypeDefault",
+        "gridDefault",
+        "logo",
+        "maxHeightPixels",
+        "maxWindowCoverage",
+        "maxWindowToDraw",
+        "maxWindowToQuery",
+        "mouseOverFunction",
+        "negateValues",
+        "smoothingWindow",
+        "transformFunc",
+        "viewLimits",
+        "viewLimitsMax",
+        "windowingFunction",
+        "yLineMark",
+        "yLineOnOff",
+        "type",
+        "group",
+    ),
+    "compositeTrack": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "allButtonPair",
+        "autoScale",
+        "centerLabelsDense",
+        "compositeTrack",
+        "dragAndDrop",
+        "hideEmptySubtracks",
+        "hideEmptySubtracksLabel",
+        "hideEmptySubtracksMultiBedUrl",
+        "hideEmptySubtracksSourcesUrl",
+        "type",
+        "group",
+    ),
+    "halSnake": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "showSnpWidth",
+        "type",
+        "group",
+    ),
+    "hic": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "autoScale",
+        "bigDataUrl",
+        "drawMode",
+        "hicDistanceMax",
+        "hicDistanceMin",
+        "normalization",
+        "resolution",
+        "saturationScore",
+        "type",
+        "group",
+    ),
+    "multiWig": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "aggregate",
+        "container",
+        "showSubtrackColorOnUi",
+        "type",
+        "group",
+    ),
+    "subGroups": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "dimensionAchecked",
+        "dimensions",
+        "filterComposite",
+        "sortOrder",
+        "subGroups",
+        "type",
+        "group",
+    ),
+    "superTrack": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "superTrack",
+        "type",
+        "group",
+    ),
+    "vcfPhasedTrio": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "bigDataIndex",
+        "bigDataUrl",
+        "geneTrack",
+        "vcfChildSample",
+        "vcfDoFilter",
+        "vcfDoMaf",
+        "vcfDoQual",
+        "vcfParentSamples",
+        "vcfUseAltSampleNames",
+        "type",
+        "group",
+    ),
+    "vcfTabix": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "bigDataIndex",
+        "bigDataUrl",
+        "bigDataUrl2",
+        "vcfDoFilter",
+        "vcfDoMaf",
+        "vcfDoQual",
+        "type",
+        "group",
+    ),
+    "view": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "configurable",
+        "view",
+        "viewUi",
+        "type",
+        "group",
+    ),
+    "assembly": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "organism",
+        "scientificName",
+        "orderKey",
+        "defaultPos",
+        "type",
+        "group",
+    ),
+    "genome": (
+        "track",
+        "bigDataUrl",
+        "shortLabel",
+        "longLabel",
+        "type",
+        "defaultPos",
+        "type",
+        "group",
+    ),
+}
@@ -9,7 +9,7 @@ from .genomes_file import GenomesFile
 from .groups import GroupsFile
 from .trackdb import TrackDb
 from . import constants
-from .track import HTMLDoc, ParameterError
+from .track import HTMLDoc, HTMLDocumented, ParameterError
 
 
 class TwoBitFile(HubComponent):
@@ -43,7 +43,9 @@ class TwoBitFile(HubComponent):
     def filename(self):
         if self._filename is not None:
             return self._filename
+        return self._cached("filename", self._default_filename)
 
+    def _default_filename(self):
         # If filename hasn't been assigned then make one automatically based
         # on the assembly's parent genomes_file and the assembly's genome.
         if not self.assembly:
@@ -64,11 +66,11 @@ class TwoBitFile(HubComponent):
     def filename(self, fn):
         self._filename = fn
 
-    def _render(self, staging="staging"):
+    def _render(self, staging="staging", skip_unchanged=False):
         pass
 
 
-class Assembly(Genome):
+class Assembly(HTMLDocumented, Genome):
     def __init__(
         self,
         genome,
@@ -108,9 +110,12 @@ class Assembly(Genome):
 
         self._orig_kwargs = kwargs
 
-        self.track_field_order = []
-        self.track_field_order.extend(constants.track_fields["assembly"])
-        self.track_field_order.extend(constants.track_fields["all"])
+        # Some parameters are listed for both, but are only written once
+        self.track_field_order = list(
+            OrderedDict.fromkeys(
+                constants.track_fields["assembly"] + constants.track_fields["all"]
+            )
+        )
 
         self.add_params(**kwargs)
 
@@ -169,13 +174,8 @@ class Assembly(Genome):
             self._orig_kwargs.pop(a)
         self.kwargs = self._orig_kwargs.copy()
 
-    @property
-    def _html(self):
-        if not self.html_string:
-            return None
-        _html = AssemblyHTMLDoc(self.html_string, self.html_string_format)
-        _html.add_parent(self)
-        return _html
+    def _new_html(self):
+        return AssemblyHTMLDoc(self._html_string, self._html_string_format)
 
     def __str__(self):
         try:
@@ -192,7 +192,7 @@ class Assembly(Genome):
             s.append("groups %s" % self.groups.filename)
 
         for name in self.track_field_order:
-            value = self.kwargs.pop(name, None)
+            value = self.kwargs.get(name)
             if value is not None:
                 if constants.param_dict[name].validate(value):
                     s.append("%s %s" % (name, value))
@@ -200,7 +200,6 @@ class Assembly(Genome):
         if self._html is not None:
             s.append("htmlDocumentation %s" % self._html.filename)
 
-        self.kwargs = self._orig_kwargs.copy()
         return "\n".join(s) + "\n"
 
     def validate(self):
@@ -212,6 +211,12 @@ class AssemblyHTMLDoc(HTMLDoc):
     # overload track-specific methods in HTMLDoc
     @property
     def filename(self):
+        return self._cached("filename", self._default_filename)
+
+    def _deduplicated(self):
+        return False
+
+    def _default_filename(self):
         if (self.genomes_file is None) or (self.genome is None):
             return None
         return os.path.join(
@@ -1,8 +1,10 @@
 from __future__ import absolute_import
 import os
+import hashlib
 import warnings
 import tempfile
 from collections import OrderedDict
+from . import settings
 
 
 def deprecation_handler(source, filename, kwargs):
@@ -31,21 +33,310 @@ def deprecation_handler(source, filename, kwargs):
     return source, filename
 
 
+# Ancestors (see HubComponent.root) and paths derived from them are cached on
+# each component, and discarded when the component's position or names, or
+# those of any of its ancestors, change (see HubComponent._path_changed).
+# Calling invalidate_caches() without arguments increments this counter, which
+# discards every cache computed under an older value.
+_epoch = 0
+
+# Setting any of these attributes on a HubComponent invalidates cached
+# ancestors and paths of the component and everything below it.
+_PATH_ATTRS = frozenset(
+    [
+        "parent",
+        "children",
+        "filename",
+        "_filename",
+        "name",
+        "genome",
+        "hub",
+        "tracktype",
+        "_tracktype",
+        "source",
+        "_source",
+        "url",
+        "_url",
+        "contents",
+    ]
+)
+
+# Of those, the attributes that change the hierarchy itself, which invalidates
+# what is cached about descendants (see HubComponent.instances) as well.
+_HIERARCHY_ATTRS = frozenset(["parent", "children"])
+
+
+# Attributes used for bookkeeping, which don't change what gets rendered
+_INTERNAL_ATTRS = frozenset(["_cache", "_cache_epoch", "_dirty", "_rendered"])
+
+# The outermost render_session while HubComponent.render() (or
+# upload.stage_hub()) is running.
+_session = None
+
+
+def invalidate_caches(component=None):
+    """
+    Discards cached ancestors and paths of every component in the hierarchy
+    that `component` is part of, or if `component` is None, of all
+    components.
+
+    This is done automatically for the affected components when they are
+    connected or when their filenames, names, etc. are changed, so it should
+    rarely be necessary to call this directly.
+    """
+    global _epoch
+    if component is None:
+        _epoch += 1
+        return
+    root, _ = component.root()
+    for obj, _ in root.leaves(HubComponent, intermediate=True):
+        object.__setattr__(obj, "_cache_epoch", -1)
+
+
+class render_session(object):
+    """
+    Context manager for rendering many components at once.
+
+    Files rendered within a session are recorded as up to date when the
+    session ends, so that rendering them again to the same place can be
+    skipped until something that affects them changes (see
+    :meth:`HubComponent._write_rendered`). Sessions may be nested, in which
+    case only the outermost one has any effect and is the one returned.
+
+    Parameters
+    ----------
+
+    workers : int or None
+        If more than 1, the session provides a thread pool of this many
+        workers as its `executor` attribute, which components can use to
+        render in parallel (see :meth:`TrackDb.write`).
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.executor = None
+
+    def __enter__(self):
+        global _session
+        self.outermost = _session is None
+        if not self.outermost:
+            return _session
+        self.rendered = []
+        # Content-addressed files already claimed by a component this session
+        self.claimed = {}
+        if self.workers is not None and self.workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.executor = ThreadPoolExecutor(self.workers)
+        _session = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _session
+        if not self.outermost:
+            return
+        _session = None
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if exc_type is not None:
+            return
+        # Rendering itself can change things (e.g., attaching HTML
+        # documentation), so the state is recorded as of the end of the
+        # session.
+        for obj, rendered_filename in self.rendered:
+            object.__setattr__(obj, "_rendered", _render_state(rendered_filename))
+            object.__setattr__(obj, "_dirty", False)
+
+
+def _render_state(rendered_filename):
+    """
+    Returns what, besides the components themselves, a rendered file depends
+    on: where it was rendered to, and the settings that change its contents.
+    """
+    return (rendered_filename, settings.VALIDATE, settings.DEDUPLICATE_HTML)
+
+
+def _get_umask():
+    # The umask can only be read by setting it, and it is shared by all
+    # threads, so this is done once at import rather than while files may be
+    # being written by other threads.
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _get_umask()
+
+
+def file_digest(filename, chunksize=1 << 20):
+    """
+    Returns the hex MD5 digest of the contents of `filename`.
+    """
+    h = hashlib.md5()
+    with open(filename, "rb") as fin:
+        for chunk in iter(lambda: fin.read(chunksize), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_file(filename, write, skip_unchanged=False):
+    """
+    Writes a file by calling `write(fout)` with a file opened for writing.
+
+    Parameters
+    ----------
+
+    filename : str
+        File to write
+
+    write : callable
+        Called with a single argument, the open file object
+
+    skip_unchanged : bool
+        If True, the new contents are first written to a temporary file next
+        to `filename`. If `filename` already exists with identical contents,
+        the temporary file is discarded and `filename` is left untouched
+        (including its modification time); otherwise the temporary file
+        replaces `filename`.
+
+    Returns True if `filename` was written, or False if it was left untouched
+    because its contents were unchanged.
+    """
+    if not skip_unchanged:
+        with open(filename, "w") as fout:
+            write(fout)
+        return True
+
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(filename) or ".",
+        prefix="." + os.path.basename(filename),
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "w") as fout:
+            write(fout)
+        if (
+            os.path.exists(filename)
+            and os.path.getsize(filename) == os.path.getsize(tmp)
+            and file_digest(filename) == file_digest(tmp)
+        ):
+            os.remove(tmp)
+            return False
+        # mkstemp creates files readable only by the owner, but rendered files
+        # will be served so should get the usual permissions.
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return True
+
+
 class HubComponent(object):
     """
     Base class for various track hub components.  Several methods must be
     overridden by subclasses.
     """
 
+    # Subclasses that may be instantiated in very large numbers (tracks) also
+    # define __slots__ so that they do not each carry an instance __dict__.
+    __slots__ = ("children", "parent", "_cache", "_cache_epoch")
+
+    # Subclasses that are rendered to their own file set this to True. Changes
+    # to other components mark the nearest such ancestor as dirty, and files
+    # are only re-rendered when dirty (see _write_rendered()).
+    _owns_file = False
+    _dirty = True
+    _rendered = None
+
     def __init__(self):
-        self.children = []
-        self.parent = None
+        # Nothing can depend on a new component yet, so there are no caches to
+        # invalidate and __setattr__ is bypassed.
+        object.__setattr__(self, "_cache_epoch", -1)
+        object.__setattr__(self, "children", [])
+        object.__setattr__(self, "parent", None)
 
-    def _render(self, staging="staging"):
+    def __setattr__(self, name, value):
+        if name in _PATH_ATTRS:
+            old_parent = getattr(self, "parent", None) if name == "parent" else None
+            object.__setattr__(self, name, value)
+            self._path_changed(name in _HIERARCHY_ATTRS, old_parent)
+            return
+        object.__setattr__(self, name, value)
+        if name not in _INTERNAL_ATTRS:
+            self._mark_dirty()
+
+    def _path_changed(self, hierarchy=False, old_parent=None):
+        """
+        Called when this component's name, filename, etc. (or if `hierarchy`
+        is True, its parent or children) change.
+
+        Cached ancestors and paths of this component and everything below it
+        are discarded, and the files they are rendered to are marked as
+        needing to be rendered again, along with the nearest file above that
+        may refer to this component. For hierarchy changes, caches of the
+        ancestors (including those of `old_parent`, when detaching) are
+        discarded too. Nothing outside this component's hierarchy is affected.
+        """
+        # Some subclasses set attributes before calling HubComponent.__init__
+        if getattr(self, "children", None):
+            below = [obj for obj, _ in self.leaves(HubComponent, intermediate=True)]
+        else:
+            below = [self]
+        for obj in below:
+            object.__setattr__(obj, "_cache_epoch", -1)
+            if obj._owns_file:
+                object.__setattr__(obj, "_dirty", True)
+        for obj in (getattr(self, "parent", None), old_parent):
+            owner_found = False
+            while obj is not None:
+                if hierarchy:
+                    object.__setattr__(obj, "_cache_epoch", -1)
+                elif owner_found:
+                    break
+                if obj._owns_file and not owner_found:
+                    object.__setattr__(obj, "_dirty", True)
+                    owner_found = True
+                obj = obj.parent
+
+    def _mark_dirty(self):
+        """
+        Marks the file this component is rendered to as needing to be
+        rendered again.
+
+        Setting attributes does this automatically; methods that change
+        a component in place (e.g., add_params) call it explicitly.
+        """
+        obj = self
+        while obj is not None:
+            if obj._owns_file:
+                object.__setattr__(obj, "_dirty", True)
+                return
+            obj = getattr(obj, "parent", None)
+
+    def _cached(self, key, func):
+        """
+        Returns `func()`, caching the result on this object under `key` until
+        the hierarchy or any paths change (see :func:`invalidate_caches`).
+        """
+        if self._cache_epoch != _epoch:
+            self._cache = {}
+            self._cache_epoch = _epoch
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func()
+            return value
+
+    def _render(self, staging="staging", skip_unchanged=False):
         """
         Renders the object to file.  Must be overridden by subclass.
 
-        Can return None if nothing to be done for the subclass.
+        Should return the rendered filename. Can return None if nothing to be
+        done for the subclass, or if `skip_unchanged` is True and the existing
+        file already has the same contents.
         """
         raise NotImplementedError(
             "%s: subclasses must define their own _render() method"
@@ -62,12 +353,28 @@ class HubComponent(object):
             % self.__class__.__name__
         )
 
+    def validate_all(self, processes=None):
+        """
+        Validates this component and everything below it, returning
+        a :class:`trackhub.validate.ValidationReport` with every error and
+        warning found instead of raising on the first one.
+
+        Identical problems across many tracks can be summarized with the
+        report's `grouped()` method. If `processes` is more than 1, parameter
+        values are validated in that many worker processes.
+        """
+        from .validate import validate_all
+
+        return validate_all(self, processes=processes)
+
     def add_child(self, child):
         """
         Adds self as parent to child, and then adds child.
         """
+        # Setting the parent also invalidates cached ancestors and paths.
         child.parent = self
         self.children.append(child)
+        self._mark_dirty()
         return child
 
     def add_parent(self, parent):
@@ -87,19 +394,26 @@ class HubComponent(object):
 
         For a fully-constructed track hub (and `cls=None`), this should return
         a a Hub object for every component in the hierarchy.
+
+        Results are cached until the hierarchy changes.
         """
-        if cls is None:
-            if self.parent is None:
-                return self, level
-        else:
-            if isinstance(self, cls):
-                if not isinstance(self.parent, cls):
-                    return self, level
+        if level:
+            return self._find_root(cls, level)
+        return self._cached(("root", cls), lambda: self._find_root(cls, 0))
 
-        if self.parent is None:
-            return None, None
+    def _find_root(self, cls, level):
+        obj = self
+        while True:
+            if cls is None:
+                if obj.parent is None:
+                    return obj, level
+            elif isinstance(obj, cls) and not isinstance(obj.parent, cls):
+                return obj, level
 
-        return self.parent.root(cls, level - 1)
+            if obj.parent is None:
+                return None, None
+            obj = obj.parent
+            level -= 1
 
     def leaves(self, cls, level=0, intermediate=False):
         """
@@ -107,39 +421,159 @@ class HubComponent(object):
 
         If `intermediate` is True, then return any intermediate classes as
         well.
+
+        Components are yielded depth-first, in the order they were added. The
+        tree is walked with an explicit stack, so the cost per component does
+        not depend on how deeply it is nested.
+        """
+        stack = [(self, level)]
+        while stack:
+            obj, _level = stack.pop()
+            if isinstance(obj, cls) and (intermediate or not obj.children):
+                yield obj, _level
+            stack.extend((child, _level + 1) for child in reversed(obj.children))
+
+    def instances(self, cls):
         """
-        if intermediate:
-            if isinstance(self, cls):
-                yield self, level
-        elif len(self.children) == 0:
-            if isinstance(self, cls):
-                yield self, level
-            else:
-                raise StopIteration
+        Returns a tuple of all components that are instances of `cls`,
+        including this one and any intermediate components, in the same order
+        as :meth:`leaves`.
 
-        for child in self.children:
-            for leaf, _level in child.leaves(cls, level + 1, intermediate=intermediate):
-                yield leaf, _level
+        The result for each class is built with a single traversal and then
+        cached until components are attached or detached anywhere in the
+        hierarchy, so repeated queries (e.g., "all Track objects") are cheap.
+        """
+        return self._cached(
+            ("instances", cls),
+            lambda: tuple(obj for obj, _ in self.leaves(cls, intermediate=True)),
+        )
 
-    def render(self, staging=None):
+    def render(self, staging=None, skip_unchanged=False, workers=None):
         """
         Renders the object to file, returning a list of created files.
 
         Calls validation code, and, as long as each child is also a subclass of
         :class:`HubComponent`, the rendering is recursive.
+
+        If `skip_unchanged` is True, files in `staging` whose contents would
+        not change are left untouched and are omitted from the returned
+        results, which then only report the files that were actually written.
+
+        Rendering again to the same `staging` directory only regenerates the
+        files that may have changed since the last time: those containing
+        components that have been modified with attribute assignment or
+        methods such as `add_params` and `add_tracks`, and the files below and
+        immediately above any component whose name, filename or place in the
+        hierarchy has changed. In-place
+        changes to mutable attributes (e.g. ``track.kwargs["color"] = ...``)
+        are not detected.
+
+        If `workers` is more than 1, components are validated first and then
+        rendered by a pool of this many threads, with the stanzas of each
+        trackDb file also formatted in chunks by the pool. The files are
+        identical to those from a serial render. Only I/O (writing and
+        comparing files) overlaps under CPython's global interpreter lock, so
+        this mostly helps hubs with many files or slow storage.
+        """
+        if workers is not None and workers > 1:
+            return self._render_parallel(staging, skip_unchanged, workers)
+        with render_session():
+            self.validate()
+            created_files = OrderedDict()
+            if staging is None:
+                staging = tempfile.mkdtemp()
+            this = self._render(staging, skip_unchanged=skip_unchanged)
+            if this:
+                created_files[repr(self)] = this
+            for child in self.children:
+                created_files[repr(child)] = child.render(
+                    staging, skip_unchanged=skip_unchanged
+                )
+        return created_files
+
+    def _render_parallel(self, staging, skip_unchanged, workers):
+        """
+        Implements render() for `workers` > 1.
         """
-        self.validate()
-        created_files = OrderedDict()
+        from .trackdb import TrackDb
+
         if staging is None:
             staging = tempfile.mkdtemp()
-        this = self._render(staging)
-        if this:
-            created_files[repr(self)] = this
-        for child in self.children:
-            created_files[repr(child)] = child.render(staging)
-        return created_files
+
+        components = []
+        for obj, _ in self.leaves(HubComponent, intermediate=True):
+            obj.validate()
+            components.append(obj)
+
+        with render_session(workers) as session:
+            futures = {}
+            serial = []
+            for obj in components:
+                # Files are rendered by the pool, except for trackDb files
+                # which use the pool themselves for formatting stanzas.
+                # Components without files of their own have little or
+                # nothing to do.
+                if (
+                    obj._owns_file
+                    and session.executor is not None
+                    and not isinstance(obj, TrackDb)
+                ):
+                    futures[id(obj)] = session.executor.submit(
+                        obj._render, staging, skip_unchanged=skip_unchanged
+                    )
+                else:
+                    serial.append(obj)
+            rendered = {}
+            for obj in serial:
+                rendered[id(obj)] = obj._render(staging, skip_unchanged=skip_unchanged)
+            for key, future in futures.items():
+                rendered[key] = future.result()
+
+        def collect(obj):
+            created_files = OrderedDict()
+            if rendered[id(obj)]:
+                created_files[repr(obj)] = rendered[id(obj)]
+            for child in obj.children:
+                created_files[repr(child)] = collect(child)
+            return created_files
+
+        return collect(self)
+
+    def write(self, fout):
+        """
+        Writes the rendered contents of this object to the open file `fout`.
+        """
+        fout.write(str(self))
+
+    def _write_rendered(self, staging, skip_unchanged=False):
+        """
+        Writes this object to its filename within `staging`.
+
+        Returns the rendered filename, or None if `skip_unchanged` is True and
+        the file's contents were unchanged.
+
+        Within a :class:`render_session`, the file is not regenerated at all
+        if it was rendered to the same place by an earlier session, still
+        exists, and nothing that could change it has happened since.
+        """
+        rendered_filename = os.path.join(staging, self.filename)
+        if _session is not None:
+            _session.rendered.append((self, rendered_filename))
+            state = _render_state(rendered_filename)
+            if (
+                not self._dirty
+                and self._rendered == state
+                and os.path.exists(rendered_filename)
+            ):
+                return None if skip_unchanged else rendered_filename
+        self.makedirs(rendered_filename)
+        if write_file(rendered_filename, self.write, skip_unchanged=skip_unchanged):
+            return rendered_filename
 
     def makedirs(self, fn):
+        # Files in the same directory may be rendered by several threads at
+        # once (see render_session), so this must not fail if another thread
+        # has just created the directory.
         dirname = os.path.dirname(fn)
-        if not os.path.exists(dirname):
-            os.makedirs(dirname)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
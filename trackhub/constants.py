@@ -1,27 +1,68 @@
 from __future__ import absolute_import
 
-from .parsed_params import param_defs, TRACKTYPES
+from . import validate
 
 # http://genome-source.cse.ucsc.edu/gitweb/
 #       ?p=kent.git;a=blob;f=src/hg/makeDb/trackDb/README;hb=HEAD
 
-param_dict = {i.name: i for i in param_defs}
-
 # These should at least be first...
 initial_params = ["track", "bigDataUrl", "shortLabel", "longLabel", "type"]
 trackhub_specific = ["source", "tracktype", "name"]
 
+INDENT = "    "
+
+# The parameter tables are loaded from _spec.py, generated from
+# parsed_params.py by trackhub/spec.py, on first access:
+#
+# - param_dict: parameter name -> Param
+# - track_fields: track type -> list of parameter names, starting with
+#   initial_params
+# - track_field_sets: track type -> frozenset of the same names
+# - observed_types: track types that have at least one parameter
+_LAZY = (
+    "param_dict",
+    "param_defs",
+    "track_fields",
+    "track_field_sets",
+    "TRACKTYPES",
+    "DATA_TRACKTYPES",
+    "observed_types",
+)
 
-track_fields = {i: initial_params[:] for i in TRACKTYPES}
 
-observed_types = set()
-for param in param_defs:
-    observed_types.update(param.types)
+def _validator(vid):
+    """
+    Returns the validator identified by `vid` in _spec.py (see
+    trackhub.spec.validator_id).
+    """
+    kind = vid[0]
+    if kind == "set":
+        return set(vid[1])
+    if kind == "validate":
+        return getattr(validate, vid[1])
+    return {"str": str, "int": int, "float": float}[kind]
 
-for tracktype in observed_types:
-    lst = track_fields[tracktype]
-    for param in param_defs:
-        if tracktype in param.types:
-            lst.append(param.name)
 
-INDENT = "    "
+def _load():
+    from . import _spec
+
+    param_defs = [
+        validate.Param(name, fmt, list(types), required, _validator(vid))
+        for name, fmt, types, required, vid in _spec.PARAMS
+    ]
+    globals().update(
+        param_dict={i.name: i for i in param_defs},
+        param_defs=param_defs,
+        track_fields={k: list(v) for k, v in _spec.TRACK_FIELDS.items()},
+        track_field_sets={k: frozenset(v) for k, v in _spec.TRACK_FIELDS.items()},
+        TRACKTYPES=list(_spec.TRACKTYPES),
+        DATA_TRACKTYPES=list(_spec.DATA_TRACKTYPES),
+        observed_types={t for i in param_defs for t in i.types},
+    )
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        _load()
+        return globals()[name]
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
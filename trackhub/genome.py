@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import os
+from collections import OrderedDict
 from .validate import ValidationError
 from .base import HubComponent
 from . import constants
@@ -34,8 +35,10 @@ class Genome(HubComponent):
 
         self._orig_kwargs = kwargs
 
-        self.track_field_order = []
-        self.track_field_order.extend(constants.track_fields["genome"])
+        # "type" is listed twice, but is only written once
+        self.track_field_order = list(
+            OrderedDict.fromkeys(constants.track_fields["genome"])
+        )
 
         self.add_params(**kwargs)
 
@@ -96,13 +99,11 @@ class Genome(HubComponent):
         )
 
         for name in self.track_field_order:
-            value = self.kwargs.pop(name, None)
+            value = self.kwargs.get(name)
             if value is not None:
                 if constants.param_dict[name].validate(value):
                     s.append("%s %s" % (name, value))
 
-        self.kwargs = self._orig_kwargs.copy()
-
         return "\n".join(s) + "\n"
 
     def validate(self):
@@ -111,7 +112,7 @@ class Genome(HubComponent):
         if self.trackdb is None:
             raise ValidationError("No TrackDb objects provided")
 
-    def _render(self, staging="staging"):
+    def _render(self, staging="staging", skip_unchanged=False):
         """
         No file is created from a Genome object -- only from its parent
         GenomesFile object.
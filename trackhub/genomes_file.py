@@ -6,6 +6,8 @@ from .base import HubComponent
 
 
 class GenomesFile(HubComponent):
+    _owns_file = True
+
     def __init__(self, genome=None, filename=None):
         """
         Represents the genomes file on disk.  Can contain multiple `Genome`
@@ -35,6 +37,9 @@ class GenomesFile(HubComponent):
     def filename(self):
         if self._filename is not None:
             return self._filename
+        return self._cached("filename", self._default_filename)
+
+    def _default_filename(self):
         if self.hub is None:
             return None
         return os.path.join(
@@ -64,13 +69,8 @@ class GenomesFile(HubComponent):
             s.append(str(genome))
         return "\n".join(s) + "\n"
 
-    def _render(self, staging="staging"):
-        rendered_filename = os.path.join(staging, self.filename)
-        self.makedirs(rendered_filename)
-        fout = open(rendered_filename, "w")
-        fout.write(str(self))
-        fout.close()
-        return fout.name
+    def _render(self, staging="staging", skip_unchanged=False):
+        return self._write_rendered(staging, skip_unchanged=skip_unchanged)
 
     def validate(self):
         if len(self.children) == 0:
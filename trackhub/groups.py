@@ -51,6 +51,8 @@ class GroupDefinition(object):
 
 
 class GroupsFile(HubComponent):
+    _owns_file = True
+
     def __init__(self, groups, filename=None):
         """
         Represents the groups file on disk, used for assembly hubs.
@@ -79,6 +81,7 @@ class GroupsFile(HubComponent):
             List of GroupDefinition objects.
         """
         self.groups.extend(groups)
+        self._mark_dirty()
 
     def __str__(self):
         """
@@ -108,7 +111,9 @@ class GroupsFile(HubComponent):
     def filename(self):
         if self._filename is not None:
             return self._filename
+        return self._cached("filename", self._default_filename)
 
+    def _default_filename(self):
         if self.genome is None:
             return None
 
@@ -134,13 +139,8 @@ class GroupsFile(HubComponent):
             )
         pass
 
-    def _render(self, staging="staging"):
+    def _render(self, staging="staging", skip_unchanged=False):
         """
         Renders the children GroupDefinition objects to file
         """
-        rendered_filename = os.path.join(staging, self.filename)
-        self.makedirs(rendered_filename)
-        fout = open(rendered_filename, "w")
-        fout.write(str(self))
-        fout.close()
-        return fout.name
+        return self._write_rendered(staging, skip_unchanged=skip_unchanged)
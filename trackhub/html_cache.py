@@ -0,0 +1,174 @@
+"""
+Conversion of reStructuredText documentation to HTML, with an optional on-disk
+cache.
+
+Converting with docutils takes tens of milliseconds per document, which adds
+up for hubs where many tracks have documentation. If `settings.HTML_CACHE_DIR`
+is set, converted documents are stored there, keyed by a hash of the contents,
+the docutils version, and the conversion settings, so unchanged documents are
+only converted once across runs. The cache is kept under
+`settings.HTML_CACHE_MAX_BYTES` by removing the least recently used entries.
+"""
+from __future__ import absolute_import
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import warnings
+from . import settings
+
+WRITER_NAME = "html"
+SETTINGS_OVERRIDES = {"output_encoding": "unicode"}
+
+# Approximate total size of each cache directory used so far by this process,
+# so that the directory only needs to be scanned when it may be over the limit
+_sizes = {}
+_lock = threading.Lock()
+
+
+def cache_key(contents):
+    """
+    Returns the cache key for converting `contents`.
+    """
+    import docutils
+
+    key = json.dumps(
+        [contents, docutils.__version__, WRITER_NAME, SETTINGS_OVERRIDES],
+        sort_keys=True,
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def convert(contents):
+    """
+    Converts reStructuredText to an HTML body, without any caching.
+    """
+    # docutils takes longer to import than the rest of trackhub, so it is only
+    # imported once there is something to convert.
+    from docutils.core import publish_parts
+
+    # docutils still internally uses a "U" mode for opening files.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parts = publish_parts(
+            contents,
+            writer_name=WRITER_NAME,
+            settings_overrides=SETTINGS_OVERRIDES,
+        )
+    return parts["html_body"]
+
+
+def rst_to_html(contents):
+    """
+    Converts reStructuredText to an HTML body, using the cache in
+    `settings.HTML_CACHE_DIR` if set.
+
+    Problems reading or writing the cache are ignored, in which case the
+    document is simply converted.
+    """
+    cache_dir = settings.HTML_CACHE_DIR
+    if cache_dir is None:
+        return convert(contents)
+
+    path = os.path.join(cache_dir, cache_key(contents) + ".html")
+    try:
+        with open(path, encoding="utf-8") as fin:
+            html = fin.read()
+    except (IOError, OSError):
+        pass
+    else:
+        # Modification times record when entries were last used, for
+        # eviction. Entries that can be read but not touched (e.g. in
+        # a read-only cache) are still used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    html = convert(contents)
+    try:
+        _store(cache_dir, path, html)
+    except (IOError, OSError):
+        pass
+    return html
+
+
+def _store(cache_dir, path, html):
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    # Written to a temporary file and then moved into place, so other
+    # processes never see a partially-written entry.
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fout:
+            fout.write(html)
+        size = os.path.getsize(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    with _lock:
+        total = _sizes.get(cache_dir)
+        if total is None:
+            total = _scan(cache_dir)[1]
+        else:
+            total += size
+        if total > settings.HTML_CACHE_MAX_BYTES:
+            total = evict(cache_dir, settings.HTML_CACHE_MAX_BYTES)
+        _sizes[cache_dir] = total
+
+
+def _scan(cache_dir):
+    """
+    Returns a list of (mtime, size, path) for each cache entry, and their
+    total size.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".html"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    return entries, sum(size for _, size, _ in entries)
+
+
+def evict(cache_dir, max_bytes):
+    """
+    Removes the least recently used entries from `cache_dir` until the total
+    size is at most `max_bytes`, and returns the new total size.
+    """
+    entries, total = _scan(cache_dir)
+    entries.sort()
+    for mtime, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+    return total
+
+
+def clear(cache_dir=None):
+    """
+    Removes all entries from `cache_dir` (default is
+    `settings.HTML_CACHE_DIR`).
+    """
+    if cache_dir is None:
+        cache_dir = settings.HTML_CACHE_DIR
+    if cache_dir is None or not os.path.exists(cache_dir):
+        return
+    with _lock:
+        evict(cache_dir, 0)
+        _sizes.pop(cache_dir, None)
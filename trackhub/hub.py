@@ -1,12 +1,13 @@
 from __future__ import absolute_import
 
-import os
 import warnings
 from .validate import ValidationError
 from .base import HubComponent
 
 
 class Hub(HubComponent):
+    _owns_file = True
+
     # map proper track hub stanza field names to pythonic attribute names in
     # this class.
 
@@ -100,14 +101,9 @@ class Hub(HubComponent):
             s.append("{0} {1}".format(label, value))
         return "\n".join(s)
 
-    def _render(self, staging="staging"):
+    def _render(self, staging="staging", skip_unchanged=False):
         """
         Render just this object, and not all the underlying GenomeFiles and
         their TrackDb.
         """
-        rendered_filename = os.path.join(staging, self.filename)
-        self.makedirs(rendered_filename)
-        fout = open(rendered_filename, "w")
-        fout.write(str(self))
-        fout.close()
-        return fout.name
+        return self._write_rendered(staging, skip_unchanged=skip_unchanged)
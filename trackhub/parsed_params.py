@@ -11,6 +11,9 @@ from . import validate
 # If something is unclear, run parse.py interactively and inspect the `debug`
 # dictionary.
 #
+# After editing this module, run `python -m trackhub.spec` to regenerate
+# _spec.py, which is what trackhub actually loads.
+#
 
 # Observed types from the parsed document
 TRACKTYPES = [
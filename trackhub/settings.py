@@ -1 +1,29 @@
 VALIDATE = True
+
+# Directory for caching the HTML converted from reStructuredText documentation
+# (see trackhub.html_cache). None disables the cache.
+HTML_CACHE_DIR = None
+
+# Least recently used entries are removed from HTML_CACHE_DIR to keep it under
+# this size
+HTML_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+# If True, HTML documentation is written once per distinct document to
+# "html/<hash>.html" next to the trackDb file, and tracks refer to it with the
+# "html" setting, rather than writing "<track name>.html" for every track.
+DEDUPLICATE_HTML = False
+
+# Number of threads used for the per-file filesystem calls (stat, symlink,
+# etc) made when staging a hub. These mostly wait on the filesystem, which
+# matters most for network filesystems, where e.g. 8 threads can help. The
+# default of 1 makes the calls one at a time, without a thread pool.
+STAGING_WORKERS = 1
+
+# How source files are placed in a staging directory; see
+# trackhub.upload.LINK_METHODS. "symlink" needs rsync's -L option to upload
+# the files themselves; the others place real files in the staging directory.
+STAGING_LINK_METHOD = "symlink"
+
+# Number of rsync processes trackhub.upload.upload_hub() runs at once, each
+# uploading a share of the files of similar total size.
+UPLOAD_JOBS = 1
@@ -0,0 +1,169 @@
+"""
+Generates ``_spec.py``, the precomputed parameter tables that
+:mod:`trackhub.constants` loads.
+
+Parameters are defined in ``parsed_params.py`` (see the notes there on
+updating them from the UCSC documentation). After changing them, regenerate
+the tables with::
+
+    python -m trackhub.spec
+
+The tables are plain Python literals, so loading them is a single import with
+no per-parameter work beyond creating the :class:`Param` objects. Parameters
+whose validator is just ``str`` are given a stricter one when it can be
+inferred unambiguously from their format (see :func:`infer_validator`).
+"""
+from __future__ import absolute_import
+
+import os
+import re
+import json
+from . import validate
+
+# Version of the layout of _spec.py, to be incremented if it changes
+VERSION = 1
+
+# Words used in formats as placeholders for a value rather than as literal
+# values; e.g., "<url/relativePath>" is a URL or a path, not one of two words.
+PLACEHOLDERS = frozenset(
+    [
+        "altName",
+        "integer",
+        "padding",
+        "relativePath",
+        "sampleName",
+        "table",
+        "tableName",
+        "url",
+    ]
+)
+
+_word = re.compile(r"[A-Za-z_][A-Za-z0-9_]*$")
+
+_HEADER = """\
+# Generated from parsed_params.py by `python -m trackhub.spec`; do not edit.
+#
+# PARAMS holds (name, fmt, types, required, validator id) for each parameter;
+# see trackhub/spec.py for validator ids. TRACK_FIELDS holds the parameter
+# names valid for each track type, in order.
+"""
+
+
+def infer_validator(name, fmt):
+    """
+    Returns the id (see :func:`validator_id`) of a validator inferred from the
+    format strings `fmt` of parameter `name`, or None if there isn't exactly
+    one format for `name` taking a single value of one of these forms:
+
+    - ``<integer>``, an int
+    - ``<#>``, ``<num>``, or ``<float>``, a float
+    - ``<a/b/c>`` or ``<a|b|c>``, one of several literal words
+
+    A single literal word, such as ``logo on``, is only an example of the
+    value and not the complete list of allowed values, so it gets no
+    validator.
+    """
+    if isinstance(fmt, str):
+        fmt = [fmt]
+    lines = [f.split() for f in fmt]
+    lines = [words for words in lines if words and words[0] == name]
+    if len(lines) != 1 or len(lines[0]) != 2:
+        return None
+    value = lines[0][1]
+
+    if value == "<integer>":
+        return ("int",)
+    if value in ("<#>", "<num>", "<float>"):
+        return ("float",)
+    if not (value.startswith("<") and value.endswith(">")):
+        return None
+    options = re.split(r"[/|]", value[1:-1])
+    if len(options) < 2:
+        return None
+    if all(_word.match(i) and i not in PLACEHOLDERS for i in options):
+        return ("set", tuple(sorted(options)))
+    return None
+
+
+def validator_id(validator):
+    """
+    Returns a tuple identifying `validator` that can be written as a literal:
+    ("str",), ("int",) or ("float",) for types, ("set", values) for sets, and
+    ("validate", name) for validators defined in :mod:`trackhub.validate`.
+    """
+    if validator in (str, int, float):
+        return (validator.__name__,)
+    if isinstance(validator, set):
+        return ("set", tuple(sorted(validator)))
+    for name, obj in vars(validate).items():
+        if obj is validator:
+            return ("validate", name)
+    raise ValueError("Validator {0!r} cannot be stored".format(validator))
+
+
+def _literal(x):
+    """
+    Formats `x` (built from strings, bools, lists and tuples) as Python
+    source.
+    """
+    if isinstance(x, str):
+        return json.dumps(x)
+    if isinstance(x, (list, tuple)):
+        items = [_literal(i) for i in x]
+        if isinstance(x, tuple) and len(items) == 1:
+            items[0] += ","
+        open_, close = "[]" if isinstance(x, list) else "()"
+        return open_ + ", ".join(items) + close
+    return repr(x)
+
+
+def generate():
+    """
+    Returns the source of ``_spec.py`` for the parameters currently defined in
+    ``parsed_params.py``.
+    """
+    from .parsed_params import param_defs, TRACKTYPES, DATA_TRACKTYPES
+    from .constants import initial_params
+
+    lines = [
+        _HEADER,
+        "VERSION = {0}".format(VERSION),
+        "",
+        "TRACKTYPES = {0}".format(_literal(tuple(TRACKTYPES))),
+        "",
+        "DATA_TRACKTYPES = {0}".format(_literal(tuple(DATA_TRACKTYPES))),
+        "",
+        "PARAMS = (",
+    ]
+    track_fields = {i: list(initial_params) for i in TRACKTYPES}
+    for param in param_defs:
+        vid = validator_id(param.validator)
+        if vid == ("str",):
+            vid = infer_validator(param.name, param.fmt) or vid
+        lines.append("    (")
+        values = (param.name, param.fmt, tuple(param.types), param.required, vid)
+        for value in values:
+            lines.append("        {0},".format(_literal(value)))
+        lines.append("    ),")
+        for tracktype in sorted(set(param.types)):
+            track_fields[tracktype].append(param.name)
+    lines.append(")")
+    lines.append("")
+    lines.append("TRACK_FIELDS = {")
+    for tracktype in TRACKTYPES:
+        lines.append("    {0}: (".format(_literal(tracktype)))
+        for name in track_fields[tracktype]:
+            lines.append("        {0},".format(_literal(name)))
+        lines.append("    ),")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    filename = os.path.join(os.path.dirname(__file__), "_spec.py")
+    with open(filename, "w") as fout:
+        fout.write(generate())
+
+
+if __name__ == "__main__":
+    main()
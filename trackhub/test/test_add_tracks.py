@@ -1,3 +1,4 @@
+import pytest
 import trackhub
 
 
@@ -246,3 +247,50 @@ view v
     parent a
     subGroups view=v"""
     )
+
+
+def test_trackdb_from_records():
+    """Tracks created in bulk render the same as tracks created one by one"""
+    records = [
+        dict(name="a", tracktype="bigWig", source="a.bw", color="128,0,0"),
+        dict(name="b", tracktype="bigWig", url="http://example.com/b.bw"),
+        dict(name="c", tracktype="bigBed 6", source="c.bb", visibility="dense"),
+    ]
+    bulk = trackhub.TrackDb.from_records(records, filename="hg38/trackDb.txt")
+
+    single = trackhub.TrackDb(filename="hg38/trackDb.txt")
+    single.add_tracks(trackhub.Track(**r) for r in records)
+
+    assert [t.name for t in bulk.tracks] == ["a", "b", "c"]
+    assert all(t.parent is bulk for t in bulk.tracks)
+    assert str(bulk) == str(single)
+
+    columns = dict(
+        (k, [r.get(k) for r in records])
+        for k in ["name", "tracktype", "source", "url", "color", "visibility"]
+    )
+    from_columns = trackhub.TrackDb.from_columns(columns, filename="hg38/trackDb.txt")
+    assert str(from_columns) == str(single)
+
+
+def test_trackdb_from_columns_errors():
+    columns = dict(
+        name=["a", "b c", "d", "e"],
+        tracktype=["bigWig", "bigWig", "bigWig", "bigBed"],
+        color=["128,0,0", "128,0,0", "128,0", "0,0,0"],
+        maxHeightPixels=[None, None, None, "8:50:128"],
+    )
+    with pytest.raises(trackhub.track.ParameterError):
+        trackhub.TrackDb.from_columns(columns)
+
+    trackdb = trackhub.TrackDb()
+    skipped = trackdb.add_columns(columns, on_error="skip")
+    # bad name, bad color, maxHeightPixels not valid for bigBed
+    assert skipped == [1, 2, 3]
+    assert [t.name for t in trackdb.tracks] == ["a"]
+
+    with pytest.raises(trackhub.track.ParameterError):
+        trackhub.TrackDb.from_columns(dict(name=["a"], fake_param=["x"]))
+
+    with pytest.raises(ValueError):
+        trackhub.TrackDb.from_columns(dict(name=["a"], tracktype=[]))
@@ -41,3 +41,21 @@ for bw in glob.glob(os.path.join(trackhub.helpers.data_dir(), "*no1*.bw")):
     trackdb.add_tracks(track)
 
 trackhub.upload.stage_hub(hub)
+
+
+def test_assembly_str():
+    # Parameters listed for both assemblies and tracks (e.g. defaultPos) are
+    # written once, and writing doesn't use them up.
+    expected = (
+        "genome newOrg1\n"
+        "trackDb newOrg1/trackDb.txt\n"
+        "twoBitPath newOrg1/newOrg1.2bit\n"
+        "organism Big Foot\n"
+        "scientificName Biggus Footus\n"
+        "orderKey 4800\n"
+        "defaultPos chr1:0-1000000\n"
+        "description BigFoot V4\n"
+        "htmlDocumentation newOrg1/newOrg1_info.html\n"
+    )
+    assert str(genome) == expected
+    assert str(genome) == expected
@@ -1,4 +1,5 @@
 import pytest
+import trackhub
 from trackhub import (
     Hub,
     GenomesFile,
@@ -151,3 +152,325 @@ def test_track_fns(components):
 def test_track_creation(components):
     track = Track(name="track0", tracktype="bam", source="t0.bam")
     assert track.source == "t0.bam"
+
+
+def test_cached_paths_follow_changes(components):
+    components.CONNECT()
+    track = components.tracks[0]
+    assert track.root()[0] is components.hub
+    assert track.filename == "dm3/track1.bam"
+
+    # changes anywhere up the hierarchy are reflected in cached paths
+    track.name = "renamed"
+    assert track.filename == "dm3/renamed.bam"
+    components.genome.genome = "dm6"
+    assert track.filename == "dm6/renamed.bam"
+    components.hub.filename = "hubdir/hub.txt"
+    assert track.filename == "hubdir/dm6/renamed.bam"
+
+    # as is moving a track to another trackdb
+    other = TrackDb(filename="other/trackDb.txt")
+    other.add_tracks(track)
+    assert track.trackdb is other
+    assert track.root()[0] is other
+    assert track.filename == "other/renamed.bam"
+
+
+def test_instances_index(components):
+    components.CONNECT()
+    assert components.trackdb.tracks == components.tracks
+    assert components.hub.instances(TrackDb) == (components.trackdb,)
+
+    # leaves that are not of the requested class are skipped rather than
+    # stopping iteration
+    assert [i for i, _ in components.hub.leaves(Hub)] == []
+
+    # attaching more tracks is reflected in the index
+    composite = CompositeTrack(name="composite", tracktype="bigWig")
+    subtrack = Track(name="subtrack", tracktype="bigWig", html_string="docs")
+    composite.add_tracks(subtrack)
+    components.trackdb.add_tracks(composite)
+    # a track with HTML documentation isn't a leaf, but is still a track
+    assert subtrack.children == [subtrack._html]
+    assert components.trackdb.tracks == components.tracks + [subtrack]
+    assert components.hub.instances(CompositeTrack) == (composite,)
+
+
+def test_compact_tracks():
+    t1 = Track(name="t1", tracktype="bigWig", color="128,0,0")
+    t2 = Track(name="t2", tracktype="bigWig")
+    for cls in (Track, CompositeTrack, ViewTrack, SuperTrack, AggregateTrack):
+        assert "__dict__" not in dir(cls)
+    assert t1.track_field_order is t2.track_field_order
+
+    # a single parameter store, still exposed as `kwargs`
+    t2.add_params(color="0,0,255")
+    assert t2.kwargs["color"] == "0,0,255"
+    t2.remove_params("color")
+    assert "color" not in t2.kwargs
+    assert "color" not in str(t2)
+
+
+def test_track_fields_registry():
+    from trackhub.track import fields_for, update_list
+    from trackhub import constants
+
+    bed = Track(name="t1", tracktype="bigBed 6+3")
+    assert bed._fields is fields_for(Track, "bigBed")
+    assert bed.track_field_order == tuple(
+        update_list(constants.track_fields["all"], constants.track_fields["bigBed"])
+    )
+
+    composite = CompositeTrack(name="c1", tracktype="bigWig")
+    assert "compositeTrack" not in bed._fields.names
+    assert "dimensions" in composite._fields.names
+    assert "dimensions" not in Track(name="t2", tracktype="bigWig")._fields.names
+
+    # changing the track type changes the valid parameters
+    bed.tracktype = "bam"
+    assert "bamColorMode" in bed._fields.names
+    assert "bamColorMode" not in fields_for(Track, "bigBed").names
+
+
+def test_stanza_uses_field_order():
+    from trackhub import settings
+
+    track = Track(name="t1", tracktype="bigWig", visibility="full")
+    track.add_params(color="128,0,0", autoScale="on")
+    assert str(track).splitlines() == [
+        "track t1",
+        "shortLabel t1",
+        "longLabel t1",
+        "type bigWig",
+        "autoScale on",
+        "color 128,0,0",
+        "visibility full",
+    ]
+
+    track.kwargs["notAParam"] = "x"
+    with pytest.raises(trackhub.track.ParameterError):
+        str(track)
+    settings.VALIDATE = False
+    try:
+        assert str(track).splitlines()[-1] == "notAParam x"
+    finally:
+        settings.VALIDATE = True
+
+
+def test_render_only_dirty_files(components, tmpdir, monkeypatch):
+    components.CONNECT()
+    staging = str(tmpdir)
+    written = []
+    orig_write = trackhub.base.write_file
+
+    def write_file(filename, write, skip_unchanged=False):
+        written.append(os.path.relpath(filename, staging))
+        return orig_write(filename, write, skip_unchanged=skip_unchanged)
+
+    monkeypatch.setattr(trackhub.base, "write_file", write_file)
+
+    def render():
+        del written[:]
+        components.hub.render(staging)
+        return sorted(written)
+
+    everything = ["dm3/trackDb.txt", "example_hub.genomes.txt", "example_hub.hub.txt"]
+    assert render() == everything
+    assert render() == []
+
+    # parameters of a track only affect its trackDb
+    components.tracks[0].add_params(visibility="dense")
+    assert render() == ["dm3/trackDb.txt"]
+    assert "visibility dense" in open(os.path.join(staging, "dm3/trackDb.txt")).read()
+    components.tracks[1].short_label = "new label"
+    assert render() == ["dm3/trackDb.txt"]
+
+    components.hub.email = "other@example.com"
+    assert render() == ["example_hub.hub.txt"]
+
+    # renaming only affects the files below and the file referring to it
+    components.tracks[0].name = "renamed"
+    assert render() == ["dm3/trackDb.txt"]
+    components.trackdb.add_tracks(Track(name="track3", tracktype="bigWig"))
+    assert render() == ["dm3/trackDb.txt"]
+    components.trackdb.add_tracks([Track(name="track4", tracktype="bigWig")])
+    assert render() == ["dm3/trackDb.txt"]
+    assert components.trackdb.tracks[-1].name == "track4"
+    assert "track track4" in open(os.path.join(staging, "dm3/trackDb.txt")).read()
+    components.genome.genome = "dm6"
+    assert render() == ["dm6/trackDb.txt", "example_hub.genomes.txt"]
+    components.genome.genome = "dm3"
+    assert render() == ["dm3/trackDb.txt", "example_hub.genomes.txt"]
+    components.genomes_file.filename = "genomes.txt"
+    assert render() == ["dm3/trackDb.txt", "example_hub.hub.txt", "genomes.txt"]
+    components.genomes_file.filename = "example_hub.genomes.txt"
+    assert render() == everything
+
+    # changes outside the hub don't affect it
+    detached = Track(name="detached", tracktype="bigWig")
+    detached.name = "renamed_detached"
+    other_trackdb = TrackDb()
+    other_trackdb.add_tracks(detached)
+    assert render() == []
+
+    # a different staging directory or a missing file is always rendered
+    os.unlink(os.path.join(staging, "dm3/trackDb.txt"))
+    assert render() == ["dm3/trackDb.txt"]
+    staging = str(tmpdir.mkdir("other"))
+    assert render() == everything
+
+
+def test_parallel_render(tmpdir):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    for i in range(20):
+        # HTML documentation is rendered by the pool, into the same directory
+        # as the trackDb file
+        composite = CompositeTrack(
+            name="composite%d" % i,
+            tracktype="bigWig",
+            html_string="composite %d" % i,
+            html_string_format="html",
+        )
+        view = ViewTrack(name="view%d" % i, view="signal", tracktype="bigWig")
+        view.add_tracks(
+            [
+                Track(
+                    name="track%d_%d" % (i, j),
+                    tracktype="bigWig",
+                    source="x.bw",
+                    html_string="track %d %d" % (i, j),
+                    html_string_format="html",
+                )
+                for j in range(5)
+            ]
+        )
+        composite.add_tracks(view)
+        trackdb.add_tracks(composite)
+    trackdb.add_tracks(Track(name="single", tracktype="bigBed", source="x.bb"))
+
+    def contents(staging):
+        result = {}
+        for root, dirs, files in os.walk(staging):
+            for fn in files:
+                path = os.path.join(root, fn)
+                with open(path) as fin:
+                    result[os.path.relpath(path, staging)] = fin.read()
+        return result
+
+    serial = hub.render(str(tmpdir.join("serial")))
+    parallel = hub.render(str(tmpdir.join("parallel")), workers=16)
+    assert len(contents(str(tmpdir.join("serial")))) == 3 + 20 * 6
+    assert contents(str(tmpdir.join("serial"))) == contents(
+        str(tmpdir.join("parallel"))
+    )
+    assert list(serial) == list(parallel)
+
+
+def test_render_leaves_umask_alone(tmpdir, monkeypatch):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    trackdb.add_tracks(Track(name="t", tracktype="bigWig", source="x.bw"))
+
+    # The umask is shared by all threads, so it must not be changed while
+    # files are being written
+    def umask(mask):
+        raise AssertionError("umask changed during rendering")
+
+    monkeypatch.setattr(os, "umask", umask)
+    staging = str(tmpdir)
+    hub.render(staging, skip_unchanged=True, workers=4)
+    mode = os.stat(os.path.join(staging, "hg38", "trackDb.txt")).st_mode
+    assert mode & 0o777 == 0o666 & ~trackhub.base._UMASK
+
+
+def test_deduplicated_html(tmpdir, monkeypatch):
+    monkeypatch.setattr(trackhub.settings, "DEDUPLICATE_HTML", True)
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    for i in range(4):
+        trackdb.add_tracks(
+            Track(
+                name="track%d" % i,
+                tracktype="bigWig",
+                url="x.bw",
+                html_string="Shared protocol" if i < 3 else "Different",
+            )
+        )
+    staging = str(tmpdir)
+    hub.render(staging)
+
+    html_dir = os.path.join(staging, "hg38", "html")
+    assert len(os.listdir(html_dir)) == 2
+    assert sorted(os.listdir(os.path.join(staging, "hg38"))) == ["html", "trackDb.txt"]
+
+    shared = trackhub.track.deduplicated_html_filename("Shared protocol", "rst")
+    stanzas = str(trackdb).split("\n\n")
+    assert ["html " + shared in s.splitlines() for s in stanzas] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    with open(os.path.join(staging, "hg38", shared)) as fin:
+        assert "Shared protocol" in fin.read()
+
+
+def test_toggle_deduplicated_html(tmpdir, monkeypatch):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    trackdb.add_tracks(
+        Track(name="track1", tracktype="bigWig", url="x.bw", html_string="Docs")
+    )
+    staging = str(tmpdir)
+    trackdb_fn = os.path.join(staging, "hg38", "trackDb.txt")
+    shared = trackhub.track.deduplicated_html_filename("Docs", "rst")
+
+    hub.render(staging)
+    with open(trackdb_fn) as fin:
+        assert "html" not in fin.read()
+
+    # the setting changes the trackDb file, which must be rendered again
+    monkeypatch.setattr(trackhub.settings, "DEDUPLICATE_HTML", True)
+    hub.render(staging)
+    with open(trackdb_fn) as fin:
+        assert "html " + shared in fin.read().splitlines()
+    assert os.path.exists(os.path.join(staging, "hg38", shared))
+
+    monkeypatch.setattr(trackhub.settings, "DEDUPLICATE_HTML", False)
+    hub.render(staging)
+    with open(trackdb_fn) as fin:
+        assert "html" not in fin.read()
+    assert os.path.exists(os.path.join(staging, "hg38", "track1.html"))
+
+
+def test_html_doc_is_single_child(tmpdir):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    track = Track(name="track1", tracktype="bigWig", url="x.bw", html_string="Old")
+    trackdb.add_tracks(track)
+    doc = track._html
+    assert track.children == [doc]
+    assert doc.parent is track
+
+    staging = str(tmpdir)
+    for _ in range(3):
+        hub.render(staging)
+    assert track._html is doc
+    assert track.children == [doc]
+
+    track.html_string = "New"
+    assert track.children == [track._html]
+    assert track._html is not doc and doc.parent is None
+    hub.render(staging)
+    with open(os.path.join(staging, "hg38", "track1.html")) as fin:
+        assert "New" in fin.read()
+
+    track.html_string = None
+    assert track._html is None
+    assert track.children == []
@@ -0,0 +1,73 @@
+import os
+import pytest
+from trackhub import html_cache, settings
+
+
+@pytest.fixture
+def cache_dir(tmpdir, monkeypatch):
+    path = str(tmpdir.join("cache"))
+    monkeypatch.setattr(settings, "HTML_CACHE_DIR", path)
+    monkeypatch.setattr(html_cache, "_sizes", {})
+    calls = []
+    convert = html_cache.convert
+
+    def counting_convert(contents):
+        calls.append(contents)
+        return convert(contents)
+
+    monkeypatch.setattr(html_cache, "convert", counting_convert)
+    return path, calls
+
+
+def test_html_cache(cache_dir):
+    path, calls = cache_dir
+    expected = html_cache.convert("Title\n-----\ntext\n")
+    assert html_cache.rst_to_html("Title\n-----\ntext\n") == expected
+    assert html_cache.rst_to_html("Title\n-----\ntext\n") == expected
+    assert len(calls) == 2  # including the call for `expected`
+    assert os.listdir(path) == [html_cache.cache_key("Title\n-----\ntext\n") + ".html"]
+
+    html_cache.rst_to_html("other text")
+    assert len(calls) == 3
+    html_cache.clear()
+    assert os.listdir(path) == []
+
+
+def test_html_cache_eviction(cache_dir, monkeypatch):
+    path, calls = cache_dir
+    docs = ["document %d" % i for i in range(5)]
+    for i, doc in enumerate(docs):
+        html_cache.rst_to_html(doc)
+        entry = os.path.join(path, html_cache.cache_key(doc) + ".html")
+        os.utime(entry, (i, i))
+    size = os.path.getsize(entry)
+
+    # Using an entry makes it the most recently used
+    html_cache.rst_to_html(docs[0])
+    assert len(calls) == 5
+
+    monkeypatch.setattr(settings, "HTML_CACHE_MAX_BYTES", size * 3)
+    html_cache.rst_to_html("one more")
+    remaining = sorted(os.listdir(path))
+    assert len(remaining) == 3
+    assert remaining == sorted(
+        html_cache.cache_key(doc) + ".html" for doc in [docs[0], docs[4], "one more"]
+    )
+
+
+def test_html_cache_unwritable(cache_dir, monkeypatch):
+    path, calls = cache_dir
+    open(path, "w").close()  # a file where the directory should be
+    assert html_cache.rst_to_html("text") == html_cache.convert("text")
+
+
+def test_html_cache_read_only_hit(cache_dir, monkeypatch):
+    path, calls = cache_dir
+    html = html_cache.rst_to_html("text")
+
+    def fail(*args, **kwargs):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(os, "utime", fail)
+    assert html_cache.rst_to_html("text") == html
+    assert len(calls) == 1
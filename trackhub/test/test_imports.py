@@ -0,0 +1,22 @@
+import sys
+import subprocess
+
+
+def test_lazy_imports():
+    # docutils, the upload machinery, and the parameter definitions should
+    # only be loaded once they are needed
+    code = (
+        "import sys, trackhub; "
+        "print(sorted(m for m in ('docutils', 'trackhub.upload', "
+        "'trackhub.parsed_params') if m in sys.modules))"
+    )
+    out = subprocess.check_output([sys.executable, "-c", code])
+    assert out.decode().strip() == "[]"
+
+
+def test_upload_attribute():
+    import trackhub
+    from trackhub import upload
+
+    assert trackhub.upload is upload
+    assert callable(trackhub.upload.stage_hub)
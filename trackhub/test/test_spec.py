@@ -0,0 +1,71 @@
+import pytest
+from trackhub import spec, constants, settings, _spec, Track
+from trackhub.track import ParameterError
+
+
+def test_spec_in_sync():
+    # If this fails, run `python -m trackhub.spec` after editing
+    # parsed_params.py
+    with open(_spec.__file__) as fin:
+        assert fin.read() == spec.generate()
+    assert _spec.VERSION == spec.VERSION
+
+
+@pytest.mark.parametrize(
+    "fmt,expected",
+    [
+        (["x <integer>"], ("int",)),
+        (["x <#>"], ("float",)),
+        (["x <off/on>"], ("set", ("off", "on"))),
+        (["x <triangle|square|arc>"], ("set", ("arc", "square", "triangle"))),
+        (["x on"], None),
+        (["x <url/relativePath>"], None),
+        (["x <Auto|integer>"], None),
+        (["x <off/1-16>"], None),
+        (["x <label>"], None),
+        (["x <min:max>"], None),
+        (["x on show"], None),
+        (["x <on/off>", "x <integer>"], None),
+        (["y <on/off>"], None),
+        ("", None),
+    ],
+)
+def test_infer_validator(fmt, expected):
+    assert spec.infer_validator("x", fmt) == expected
+
+
+def test_inferred_validators():
+    assert constants.param_dict["maxWindowToQuery"].validator is int
+    assert constants.param_dict["hideEmptySubtracks"].validator == {"on", "off"}
+    track = Track(name="t", tracktype="bigWig")
+    track.add_params(maxWindowToQuery="100000")
+    with pytest.raises(ParameterError):
+        track.add_params(maxWindowToQuery="lots")
+    track = Track(name="t", tracktype="bigBed")
+    track.add_params(exonNumbers="on")
+    with pytest.raises(ParameterError):
+        track.add_params(exonNumbers="yes")
+
+
+def test_single_word_example_is_not_a_set():
+    # "logo on" documents an example value, not the only allowed one
+    assert constants.param_dict["logo"].validator is str
+    track = Track(name="t", tracktype="bigWig")
+    track.add_params(logo="off")
+    assert "logo off" in str(track).splitlines()
+
+
+def test_observed_types():
+    assert constants.observed_types == {
+        t for p in constants.param_defs for t in p.types
+    }
+
+
+def test_inferred_validators_respect_settings(monkeypatch):
+    # Like other validators, inferred ones only raise if validation is on
+    monkeypatch.setattr(settings, "VALIDATE", False)
+    track = Track(name="t", tracktype="bigWig")
+    track.add_params(maxWindowToQuery="lots", hideEmptySubtracks="maybe")
+    lines = str(track).splitlines()
+    assert "maxWindowToQuery lots" in lines
+    assert "hideEmptySubtracks maybe" in lines
@@ -7,7 +7,7 @@ them all and test that the output is as expected.
 import trackhub
 
 
-def test_supertrack():
+def test_supertrack(tmpdir):
     hub, genomes_file, genome, trackdb = trackhub.default_hub(
         hub_name="supertrack",
         short_label="example supertrack hub",
@@ -142,10 +142,36 @@ superTrack on
     type bigWig
     parent composite_under_supertrack
 """
-    with open("super.test.observed", "w") as fout:
+    with open(str(tmpdir.join("super.test.observed")), "w") as fout:
         fout.write(results)
 
-    with open("super.test.expected", "w") as fout:
+    with open(str(tmpdir.join("super.test.expected")), "w") as fout:
         fout.write(expected)
 
     assert results == expected
+
+
+def test_trackdb_write_streams_to_file(tmpdir):
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="supertrack",
+        genome="hg38",
+        email="dalerr@nih.gov",
+    )
+    supertrack = trackhub.SuperTrack(name="super")
+    composite = trackhub.CompositeTrack(name="composite", tracktype="bigWig")
+    view = trackhub.ViewTrack(name="view", view="viewtrack", tracktype="bigWig")
+    view.add_tracks(
+        trackhub.Track(url="https://google.com", tracktype="bigWig", name="t1")
+    )
+    composite.add_tracks(view)
+    supertrack.add_tracks(composite)
+    trackdb.add_tracks(supertrack)
+
+    fn = str(tmpdir.join("trackDb.txt"))
+    with open(fn, "w") as fout:
+        trackdb.write(fout)
+    observed = open(fn).read()
+    assert observed == str(trackdb)
+
+    # nested blank lines are not indented in the trackDb file
+    assert "\n\n            track t1\n" in observed
@@ -0,0 +1,176 @@
+import threading
+import trackhub
+import pytest
+from trackhub import validate, constants
+from trackhub.validate import ValidationError
+
+
+@pytest.fixture
+def cache():
+    validate.validation_cache.clear()
+    yield validate.validation_cache
+    validate.validation_cache.clear()
+
+
+def test_validation_cache(cache):
+    color = constants.param_dict["color"]
+    assert color.validate("128,0,0")
+    assert color.validate("128,0,0")
+    assert cache.info()["hits"] == 1
+    assert cache.info()["misses"] == 1
+
+    # failures that raise are not cached
+    for i in range(2):
+        with pytest.raises(ValidationError):
+            color.validate("128,0")
+    assert cache.info()["currsize"] == 1
+
+
+def test_validation_cache_threaded_counts():
+    cache = validate.ValidationCache()
+    cache.set("a", True)
+
+    def lookups():
+        for i in range(10000):
+            cache.get("a")
+            cache.get("b")
+
+    threads = [threading.Thread(target=lookups) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.info()["hits"] == cache.info()["misses"] == 80000
+
+
+def test_validation_cache_unhashable(cache):
+    param = validate.Param(
+        name="test", fmt=[], types=["all"], required=False, validator=lambda v: True
+    )
+    assert param.validate(["not", "hashable"])
+    assert cache.info()["currsize"] == 0
+
+
+def test_validation_cache_bounded(cache):
+    cache.maxsize = 10
+    try:
+        priority = constants.param_dict["priority"]
+        for i in range(20):
+            priority.validate(str(i))
+        assert cache.info()["currsize"] == 10
+    finally:
+        cache.maxsize = 4096
+
+
+def test_validator_examples():
+    # Examples given to @validator are no longer checked at import time
+    validators = [v for v in vars(validate).values() if hasattr(v, "self_test")]
+    validators.extend(p.validator for p in constants.param_dict.values())
+    assert len(validators) > 10
+    for v in validators:
+        if hasattr(v, "self_test"):
+            v.self_test()
+
+
+@pytest.mark.parametrize(
+    "name,values",
+    [
+        ("RGB", ["128,0,255", "0,0,0", "255,255,255", "007,1,2", "256,0,0",
+                 "1,2", "1,2,3,4", "a,b,c", " 1,2,3", "-0,1,2", ""]),
+        ("RGBList", ["128,0,0 90,90,5", "128,0,0", "1,2,3 4,5,6 7,8,9",
+                     "1,2,3  4,5,6", "1,2,300 4,5,6"]),
+        ("alphanumeric_", ["asdf1234_33", "AZ90", "", "a-b", "a b", "é"]),
+        ("hex_or_named", ["#FF0000", "#ff0000", "maroon", "Maroon",
+                          "#FF00000", "#GG0000", "", ["red"], None]),
+    ],
+)
+def test_fast_validators_agree(name, values, monkeypatch):
+    monkeypatch.setattr(validate.settings, "VALIDATE", False)
+    v = getattr(validate, name)
+    assert v._fast is not None
+    for value in values:
+        try:
+            expected = bool(v._func(value))
+        except Exception:
+            expected = False
+        # the fast path may decline a valid value, but never accept an
+        # invalid one
+        if v._fast(value):
+            assert expected, value
+        assert bool(v(value)) == expected, value
+
+
+def test_validate_column():
+    mask, failed = validate.validate_column(
+        "color", ["128,0,0", "128,0", "128,0,0", None, "0,0,0", "128,0"]
+    )
+    assert mask == [True, False, True, True, True, False]
+    assert failed == [1, 5]
+
+    # equal values of different types are validated separately
+    mask, failed = validate.validate_column("visibility", [1, True, "full"])
+    assert failed == [0, 1]
+
+    # unhashable values are validated one by one
+    mask, failed = validate.validate_column("priority", [[1], "1", "1"])
+    assert failed == [0]
+
+    with pytest.raises(ValidationError):
+        validate.validate_column("fake_param", ["a"])
+
+
+def test_validate_column_numpy():
+    np = pytest.importorskip("numpy")
+    mask, failed = validate.validate_column(
+        "color", np.array(["128,0,0", "128,0", "128,0,0", "0,0,0"])
+    )
+    assert mask.tolist() == [True, False, True, True]
+    assert failed.tolist() == [1]
+
+    mask, failed = validate.validate_column(
+        "color", np.array(["128,0", None, "0,0,0"], dtype=object)
+    )
+    assert mask.tolist() == [False, True, True]
+    assert failed.tolist() == [0]
+
+
+def test_validate_all():
+    hub, genomes_file, genome, trackdb = trackhub.default_hub(
+        hub_name="myhub", genome="hg38", email="none@example.com"
+    )
+    for i in range(5):
+        trackdb.add_tracks(
+            trackhub.Track(
+                name="t%d" % i,
+                tracktype="bigWig",
+                url="t%d.bw" % i,
+                color="128,0" if i % 2 else "128,0,0",
+                short_label="a very long short label",
+            )
+        )
+    trackdb.add_tracks(
+        trackhub.Track(name="bad", tracktype="bigBed", url="x.bb", fake_param="1")
+    )
+
+    report = hub.validate_all()
+    assert not report.ok
+    prefix = "myhub/GenomesFile/hg38/TrackDb/"
+    paths = [path for path, message in report.errors]
+    assert paths == [prefix + "bad", prefix + "t1", prefix + "t3"]
+
+    grouped = report.grouped()
+    assert grouped[0][0].startswith('parameter "color": Value 128,0 failed RGB')
+    assert grouped[0][1] == 2
+    assert grouped[0][2] == [prefix + "t1", prefix + "t3"]
+
+    # one warning per track with the long label, even though the value is only
+    # validated once
+    assert len(report.grouped("warnings")) == 1
+    assert report.grouped("warnings")[0][1] == 5
+
+    with pytest.raises(ValidationError):
+        report.raise_errors()
+
+    parallel = hub.validate_all(processes=2)
+    assert sorted(parallel.errors) == sorted(report.errors)
+    assert sorted(parallel.warnings) == sorted(report.warnings)
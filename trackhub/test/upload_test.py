@@ -1,4 +1,8 @@
 import os
+import shutil
+import threading
+import subprocess as sp
+import filecmp
 from textwrap import dedent
 import pytest
 import tempfile
@@ -92,9 +96,328 @@ def test_upload(upload_obj):
     )
 
 
+def test_upload_hub_temporary_staging(upload_obj, tmpdir, monkeypatch):
+    monkeypatch.setattr(upload, "run", lambda cmds: None)
+    staging = str(tmpdir)
+    linknames = upload.upload_hub(upload_obj.hub, None, "/remote", staging=staging)
+    assert all(i.startswith(staging) for i in linknames)
+
+    # the temporary staging directory is removed, so paths are relative to it
+    relpaths = upload.upload_hub(upload_obj.hub, None, "/remote")
+    assert relpaths == [os.path.relpath(i, staging) for i in linknames]
+    assert "dm3/trackDb.txt" in relpaths
+
+
 def test_render(upload_obj):
     trackdb = str(upload_obj.trackdb)
     # make sure some of the trackdb rendered correctly
     assert "track track1" in trackdb
     assert "bigDataUrl track1.bigBed" in trackdb
     assert "bigDataUrl ../3.bw" in trackdb
+
+
+def test_stage_hub_single_pass(upload_obj, monkeypatch):
+    composite = CompositeTrack(
+        name="composite", tracktype="bigWig", html_string="composite docs"
+    )
+    composite.add_tracks(
+        Track(
+            name="track4",
+            tracktype="bigWig",
+            source=os.path.join(d, "sine-hg38-2.bedgraph.bw"),
+            html_string="track docs",
+        )
+    )
+    upload_obj.trackdb.add_tracks(composite)
+
+    calls = []
+    orig = TrackDb._render
+
+    def _render(self, staging="staging", **kwargs):
+        calls.append(self)
+        return orig(self, staging, **kwargs)
+
+    monkeypatch.setattr(TrackDb, "_render", _render)
+
+    staging_dir, linknames = upload.stage_hub(upload_obj.hub)
+    assert calls == [upload_obj.trackdb]
+    assert len(linknames) == len(set(linknames))
+    for fn in ["dm3/composite.html", "dm3/track4.html", "dm3/track4.bigWig"]:
+        assert os.path.exists(os.path.join(staging_dir, fn))
+
+
+def test_stage_hub_skip_unchanged(upload_obj, tmpdir):
+    staging = str(tmpdir)
+    _, linknames = upload.stage_hub(upload_obj.hub, staging, skip_unchanged=True)
+    trackdb_fn = os.path.join(staging, "dm3", "trackDb.txt")
+    assert trackdb_fn in linknames
+    os.utime(trackdb_fn, (0, 0))
+
+    # nothing changed, so nothing rendered is reported and mtimes are kept
+    _, linknames = upload.stage_hub(upload_obj.hub, staging, skip_unchanged=True)
+    assert trackdb_fn not in linknames
+    assert os.path.getmtime(trackdb_fn) == 0
+
+    upload_obj.tracks[0].add_params(color="128,0,0")
+    results = upload_obj.hub.render(staging, skip_unchanged=True)
+    assert list(_flatten(results)) == [trackdb_fn]
+    assert "color 128,0,0" in open(trackdb_fn).read()
+
+
+def _flatten(results):
+    for v in results.values():
+        if isinstance(v, dict):
+            for i in _flatten(v):
+                yield i
+        else:
+            yield v
+
+
+def test_stage_hub_incremental(upload_obj, tmpdir):
+    staging = str(tmpdir)
+    _, linknames = upload.stage_hub(upload_obj.hub, staging, incremental=True)
+    manifest = upload.Manifest.load(staging)
+    assert sorted(manifest.entries) == [
+        "3.bw",
+        "dm3/track1.bigBed",
+        "dm3/track2.bigWig",
+        "dm3/trackDb.txt",
+        "example_hub.genomes.txt",
+        "example_hub.hub.txt",
+    ]
+    assert sorted(linknames) == sorted(manifest.path(i) for i in manifest.entries)
+    assert manifest.entries["dm3/trackDb.txt"]["source"] is None
+    assert manifest.entries["dm3/trackDb.txt"]["hash"] is not None
+    assert manifest.entries["3.bw"]["source"] == upload_obj.tracks[2].source
+
+    # nothing changed
+    _, linknames = upload.stage_hub(upload_obj.hub, staging, incremental=True)
+    assert linknames == []
+
+    # a dropped track is removed from staging, and the trackDb is updated
+    upload_obj.trackdb.children.remove(upload_obj.tracks[2])
+    upload_obj.tracks[2].parent = None
+    _, linknames = upload.stage_hub(upload_obj.hub, staging, incremental=True)
+    assert linknames == [os.path.join(staging, "dm3", "trackDb.txt")]
+    assert not os.path.exists(os.path.join(staging, "3.bw"))
+    manifest = upload.Manifest.load(staging)
+    assert "3.bw" not in manifest.entries
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_stage_hub_workers(upload_obj, tmpdir, incremental):
+    staged = {}
+    for workers in [1, 4]:
+        staging = str(tmpdir.join(str(workers)))
+        timings = {}
+        _, linknames = upload.stage_hub(
+            upload_obj.hub,
+            staging,
+            incremental=incremental,
+            workers=workers,
+            timings=timings,
+        )
+        assert {"render", "stat", "mkdir", "link"} <= set(timings)
+        staged[workers] = sorted(
+            (os.path.relpath(i, staging), os.path.islink(i) and os.readlink(i))
+            for i in linknames
+        )
+    assert staged[1] == staged[4]
+
+
+def test_stage_hub_missing_sources(upload_obj, tmpdir):
+    upload_obj.tracks[0].source = "missing1.bw"
+    upload_obj.tracks[1].source = "missing2.bw"
+    with pytest.raises(ValueError, match="and 1 other missing"):
+        upload.stage_hub(upload_obj.hub, str(tmpdir), workers=2)
+    assert not os.path.exists(str(tmpdir.join("3.bw")))
+
+
+@pytest.mark.parametrize("link_method", sorted(upload.LINK_METHODS))
+def test_stage_hub_link_methods(upload_obj, tmpdir, link_method):
+    staging = str(tmpdir)
+    upload.stage_hub(
+        upload_obj.hub, staging, incremental=True, link_method=link_method
+    )
+    manifest = upload.Manifest.load(staging)
+    for relpath in ["3.bw", "dm3/track1.bigBed", "dm3/track2.bigWig"]:
+        entry = manifest.entries[relpath]
+        path = manifest.path(relpath)
+        assert entry["link"] in upload.LINK_METHODS[link_method]
+        assert os.path.islink(path) == (entry["link"] == "symlink")
+        assert os.path.samefile(path, entry["source"]) == (
+            entry["link"] in ("symlink", "hardlink")
+        )
+        assert filecmp.cmp(path, entry["source"], shallow=False)
+    assert manifest.entries["dm3/trackDb.txt"]["link"] is None
+
+
+def test_stage_hub_change_link_method(upload_obj, tmpdir):
+    staging = str(tmpdir)
+    upload.stage_hub(upload_obj.hub, staging, incremental=True)
+    _, linknames = upload.stage_hub(
+        upload_obj.hub, staging, incremental=True, link_method="copy"
+    )
+    assert len(linknames) == 3
+    assert not any(os.path.islink(i) for i in linknames)
+
+    # copies are kept as long as copies are allowed
+    _, linknames = upload.stage_hub(
+        upload_obj.hub, staging, incremental=True, link_method="reflink"
+    )
+    assert linknames == []
+
+    with pytest.raises(ValueError):
+        upload.stage_hub(upload_obj.hub, staging, link_method="rsync")
+
+
+def test_upload_hub_files_from(upload_obj, tmpdir, monkeypatch):
+    calls = []
+
+    def run(cmds):
+        files = None
+        if "--files-from" in cmds:
+            with open(cmds[cmds.index("--files-from") + 1]) as fin:
+                files = sorted(fin.read().split("\0")[:-1])
+        calls.append((cmds[-1], files))
+
+    monkeypatch.setattr(upload, "run", run)
+    staging = str(tmpdir.join("staging"))
+
+    def upload_hub(remote_dir, **kwargs):
+        del calls[:]
+        upload.upload_hub(
+            upload_obj.hub,
+            None,
+            remote_dir,
+            staging=staging,
+            incremental=True,
+            **kwargs
+        )
+        return calls
+
+    # first upload to each remote is a full sync
+    assert upload_hub("/remote1") == [("/remote1/", None)]
+    assert upload_hub("/remote1") == []
+    assert upload_hub("/remote2") == [("/remote2/", None)]
+
+    upload_obj.tracks[0].add_params(visibility="dense")
+    assert upload_hub("/remote1") == [("/remote1/", ["dm3/trackDb.txt"])]
+    assert upload_hub("/remote1") == []
+    assert upload_hub("/remote1", full_sync=True) == [("/remote1/", None)]
+    assert upload_hub("/remote2") == [("/remote2/", ["dm3/trackDb.txt"])]
+
+
+@pytest.mark.skipif(shutil.which("rsync") is None, reason="rsync not installed")
+def test_upload_hub_files_from_rsync(upload_obj, tmpdir):
+    staging = str(tmpdir.join("staging"))
+    remote = str(tmpdir.join("remote"))
+    upload.upload_hub(
+        upload_obj.hub, None, remote, staging=staging, incremental=True
+    )
+    assert os.path.exists(os.path.join(remote, "3.bw"))
+    assert not os.path.exists(os.path.join(remote, upload.Manifest.filename))
+
+    upload_obj.tracks[0].add_params(visibility="dense")
+    os.remove(os.path.join(remote, "3.bw"))
+    upload.upload_hub(
+        upload_obj.hub, None, remote, staging=staging, incremental=True
+    )
+    with open(os.path.join(remote, "dm3", "trackDb.txt")) as fin:
+        assert "visibility dense" in fin.read()
+    assert not os.path.exists(os.path.join(remote, "3.bw"))
+
+    upload.upload_hub(
+        upload_obj.hub,
+        None,
+        remote,
+        staging=staging,
+        incremental=True,
+        full_sync=True,
+    )
+    assert filecmp.cmp(
+        os.path.join(remote, "3.bw"), upload_obj.tracks[2].source, shallow=False
+    )
+
+
+def test_partition():
+    sizes = {"a/1": 10, "b/1": 6, "b/2": 5, "hub.txt": 1, "a/2": 1}
+    assert upload.partition(sizes, 2) == [["a/1", "a/2", "hub.txt"], ["b/1", "b/2"]]
+
+    sizes["a/1"] = 4
+    assert upload.partition(sizes, 2) == [["a/1", "b/2"], ["a/2", "b/1", "hub.txt"]]
+    assert upload.partition(sizes, 2, key=upload.genome_key) == [
+        ["b/1", "b/2"],
+        ["a/1", "a/2", "hub.txt"],
+    ]
+
+    assert len(upload.partition(sizes, 10)) == 5
+    assert upload.partition({}, 4) == []
+
+
+def test_upload_hub_shards(upload_obj, tmpdir, monkeypatch):
+    calls = []
+    lock = threading.Lock()
+    fail = []
+
+    def run(cmds, prefix=""):
+        with open(cmds[cmds.index("--files-from") + 1]) as fin:
+            files = sorted(fin.read().split("\0")[:-1])
+        with lock:
+            calls.append((prefix, files))
+        if set(files) & set(fail):
+            raise sp.CalledProcessError(1, cmds)
+
+    monkeypatch.setattr(upload, "run", run)
+    staged = [
+        "3.bw",
+        "dm3/track1.bigBed",
+        "dm3/track2.bigWig",
+        "dm3/trackDb.txt",
+        "example_hub.genomes.txt",
+        "example_hub.hub.txt",
+    ]
+
+    upload.upload_hub(upload_obj.hub, None, "/remote", jobs=2)
+    assert sorted(i[0] for i in calls) == ["[1/2] ", "[2/2] "]
+    assert sorted(sum((i[1] for i in calls), [])) == staged
+
+    del calls[:]
+    upload.upload_hub(upload_obj.hub, None, "/remote", jobs=2, shard_by="genome")
+    assert sorted(i[1] for i in calls) == [
+        ["3.bw", "example_hub.genomes.txt", "example_hub.hub.txt"],
+        ["dm3/track1.bigBed", "dm3/track2.bigWig", "dm3/trackDb.txt"],
+    ]
+
+    # Shards uploaded before a failure aren't uploaded again
+    staging = str(tmpdir)
+    del calls[:]
+    fail.append("3.bw")
+    kwargs = dict(staging=staging, incremental=True, jobs=3)
+    with pytest.raises(upload.UploadError) as excinfo:
+        upload.upload_hub(upload_obj.hub, None, "/remote", **kwargs)
+    assert len(calls) == 3
+    assert len(excinfo.value.errors) == 1
+    failed = excinfo.value.errors[0][0]
+    assert "3.bw" in failed
+    assert sorted(excinfo.value.uploaded + failed) == staged
+
+    del calls[:]
+    del fail[:]
+    upload.upload_hub(upload_obj.hub, None, "/remote", **kwargs)
+    assert [i[1] for i in calls] == [failed]
+
+    with pytest.raises(ValueError):
+        upload.upload_hub(upload_obj.hub, None, "/remote", jobs=2, shard_by="track")
+
+
+@pytest.mark.skipif(shutil.which("rsync") is None, reason="rsync not installed")
+def test_upload_hub_shards_rsync(upload_obj, tmpdir):
+    remote = str(tmpdir.join("remote"))
+    staging, linknames = upload.stage_hub(upload_obj.hub, str(tmpdir.join("s")))
+    upload.upload_hub(upload_obj.hub, None, remote, jobs=3)
+    for linkname in linknames:
+        relpath = os.path.relpath(linkname, staging)
+        assert filecmp.cmp(
+            linkname, os.path.join(remote, relpath), shallow=False
+        ), relpath
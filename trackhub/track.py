@@ -2,12 +2,13 @@ from __future__ import absolute_import
 
 import os
 import re
-import warnings
-from docutils.core import publish_parts
+import hashlib
+from trackhub import base
 from trackhub.base import HubComponent, deprecation_handler
 from trackhub import hub
 from trackhub import constants
 from trackhub import settings
+from trackhub import html_cache
 
 
 TRACKTYPES = [
@@ -27,9 +28,25 @@ TRACKTYPES = [
 ]
 
 
+_invalid_name = re.compile("[^a-zA-Z0-9-_]")
+
+
+def deduplicated_html_filename(contents, html_string_format):
+    """
+    Returns the path, relative to the trackDb file's directory, used for HTML
+    documentation when `settings.DEDUPLICATE_HTML` is True.
+
+    The filename is a hash of the documentation, so tracks with identical
+    documentation share a single file.
+    """
+    digest = hashlib.sha256(
+        "{0}\0{1}".format(html_string_format, contents).encode("utf-8")
+    ).hexdigest()
+    return os.path.join("html", digest[:32] + ".html")
+
+
 def _check_name(name):
-    regex = re.compile("[^a-zA-Z0-9-_]")
-    if regex.search(name):
+    if _invalid_name.search(name):
         raise ValueError('Non-alphanumeric character in name "%s"' % name)
 
 
@@ -37,6 +54,62 @@ class ParameterError(Exception):
     pass
 
 
+class TrackFields(object):
+    """
+    The UCSC parameters valid for a particular kind of track.
+
+    Instances are shared between all tracks of the same class and base track
+    type (see :func:`track_fields`) and should not be modified.
+
+    Attributes
+    ----------
+
+    order : tuple
+        Parameter names in the order they are rendered
+
+    names : frozenset
+        The same names, for fast membership tests
+
+    rank : dict
+        Maps each name to its position in `order`
+    """
+
+    __slots__ = ("order", "names", "rank")
+
+    def __init__(self, order):
+        self.order = tuple(order)
+        self.names = frozenset(order)
+        self.rank = dict((name, i) for i, name in enumerate(self.order))
+
+
+# Registry of TrackFields, keyed by (track class, base track type)
+_track_fields = {}
+
+
+def fields_for(cls, tracktype):
+    """
+    Returns the shared :class:`TrackFields` for tracks of class `cls` with
+    track type `tracktype`.
+
+    Only the first word of `tracktype` is used (e.g. "bigBed 6+3" is treated
+    as "bigBed"). Entries are computed the first time they are requested and
+    re-used from then on, so creating tracks never needs to sort parameter
+    names.
+    """
+    base_tracktype = tracktype.split()[0]
+    key = (cls, base_tracktype)
+    try:
+        return _track_fields[key]
+    except KeyError:
+        pass
+    field_sets = constants.track_field_sets
+    fields = field_sets["all"].union(field_sets[base_tracktype])
+    for group in cls._field_groups:
+        fields = fields.union(field_sets[group])
+    entry = _track_fields[key] = TrackFields(update_list([], list(fields)))
+    return entry
+
+
 def update_list(existing, new, first=constants.initial_params):
     """
     Extend a list, but with constraints.
@@ -59,12 +132,34 @@ def update_list(existing, new, first=constants.initial_params):
     if first is None:
         first = []
 
-    combined = set(existing + new)
+    combined = set(existing).union(new)
     beginning = [i for i in first if i in combined]
     end = sorted(combined.difference(first))
     return beginning + end
 
 
+def iter_stanza_lines(track):
+    """
+    Yields the lines of `track`'s stanza, followed by the stanzas of any tracks
+    nested within it (views, subtracks, etc).
+
+    Nested stanzas are preceded by a blank line and indented by
+    `constants.INDENT` for each level of nesting. The tree is walked with an
+    explicit stack, so lines are produced one at a time without building up
+    the string for any subtree.
+    """
+    stack = [(track, 0)]
+    while stack:
+        obj, depth = stack.pop()
+        if depth:
+            yield constants.INDENT * (depth - 1)
+        indent = constants.INDENT * depth
+        for line in obj._stanza_lines():
+            yield indent + line
+        children = obj._stanza_children()
+        stack.extend((child, depth + 1) for child in reversed(children))
+
+
 class SubGroupDefinition(object):
     def __init__(self, name, label, mapping, default="none"):
         """
@@ -119,7 +214,102 @@ class SubGroupDefinition(object):
         return " ".join(s)
 
 
-class BaseTrack(HubComponent):
+class HTMLDocumented(object):
+    """
+    Mixin for components with HTML documentation (tracks and assemblies).
+
+    The documentation is given as `html_string` and kept as a single child
+    component, created by the subclass's `_new_html()` method, which is
+    replaced whenever `html_string` or `html_string_format` change.
+    """
+
+    __slots__ = ()
+
+    # Defaults for subclasses without __slots__; BaseTrack sets these in
+    # __init__ instead.
+    _html_string = None
+    _html_string_format = "rst"
+    _htmldoc = None
+
+    @property
+    def html_string(self):
+        """
+        Documentation, rendered to a separate HTML file.
+        """
+        return self._html_string
+
+    @html_string.setter
+    def html_string(self, value):
+        if value != self._html_string:
+            self._html_string = value
+            self._update_html()
+
+    @property
+    def html_string_format(self):
+        return self._html_string_format
+
+    @html_string_format.setter
+    def html_string_format(self, value):
+        if value != self._html_string_format:
+            self._html_string_format = value
+            self._update_html()
+
+    @property
+    def _html(self):
+        """
+        The HTMLDoc child for `html_string`, or None if there is no
+        documentation.
+        """
+        return self._htmldoc
+
+    def _update_html(self):
+        """
+        Replaces the HTMLDoc child after `html_string` or `html_string_format`
+        have changed.
+
+        The child is kept between renders rather than created on demand, so
+        it is rendered along with the rest of the hierarchy.
+        """
+        old = self._htmldoc
+        if old is not None:
+            self.children.remove(old)
+            old.parent = None
+        new = None
+        if self._html_string:
+            new = self.add_child(self._new_html())
+        self._htmldoc = new
+
+    def _new_html(self):
+        """
+        Returns a new HTMLDoc (or subclass) for the current documentation.
+        Must be overridden by subclass.
+        """
+        raise NotImplementedError(
+            "%s: subclasses must define their own _new_html() method"
+            % self.__class__.__name__
+        )
+
+
+class BaseTrack(HTMLDocumented, HubComponent):
+    __slots__ = (
+        "name",
+        "_tracktype",
+        "short_label",
+        "long_label",
+        "_source",
+        "_filename",
+        "_html_string",
+        "_html_string_format",
+        "_htmldoc",
+        "subgroups",
+        "_fields",
+        "_params",
+    )
+
+    # Groups of parameters from constants.track_fields that are valid for this
+    # class in addition to those for "all" tracks and for the track type.
+    _field_groups = ()
+
     def __init__(
         self,
         name,
@@ -194,36 +384,33 @@ class BaseTrack(HubComponent):
         source, filename = deprecation_handler(source, filename, kwargs)
         HubComponent.__init__(self)
         _check_name(name)
-        self.name = name
 
-        # Dictionary where keys are parameter names (e.g., "color") and values
-        # are Param objects.  These are defined in the constants module. To
-        # start, we add the params valid for all tracks.
-        #
-        # The Track subclass will add its own parameters when the track type is
-        # set. Other subclasses (Composite and View) will add their own special
-        # params in the class definition.
-        self.track_field_order = []
-        self.track_field_order = update_list(
-            self.track_field_order, constants.track_fields["all"]
-        )
-
-        # NOTE: when setting track type, it will update the track field order
-        # according to the known params for that track...so
-        # self.track_field_order needs to exist first.
-        self.tracktype = tracktype
+        # As in HubComponent.__init__, there's nothing to invalidate for a new
+        # track, so attributes are set without going through __setattr__.
+        # Tracks are often created by the thousands, and this halves the time
+        # it takes.
+        set_ = object.__setattr__
+        set_(self, "name", name)
+
+        # The parameters valid for this class and track type (see
+        # fields_for()); this is what the tracktype setter does.
+        set_(self, "_tracktype", tracktype)
+        set_(self, "_fields", fields_for(self.__class__, tracktype))
         if short_label is None:
             short_label = name
-        self.short_label = short_label
+        set_(self, "short_label", short_label)
         if long_label is None:
             long_label = short_label
-        self.long_label = long_label
-
-        self._source = source
-        self._filename = filename
-        self.html_string = html_string
-        self.html_string_format = html_string_format
-        self.subgroups = {}
+        set_(self, "long_label", long_label)
+
+        set_(self, "_source", source)
+        set_(self, "_filename", filename)
+        set_(self, "_html_string", html_string)
+        set_(self, "_html_string_format", html_string_format)
+        set_(self, "_htmldoc", None)
+        if html_string:
+            self._update_html()
+        set_(self, "subgroups", {})
         self.add_subgroups(subgroups)
 
         # Convert pythonic strings to UCSC versions
@@ -232,17 +419,22 @@ class BaseTrack(HubComponent):
         kwargs["longLabel"] = kwargs.get("longLabel", long_label)
         kwargs["shortLabel"] = kwargs.get("shortLabel", short_label)
 
-        self.kwargs = kwargs
-
-        self._orig_kwargs = kwargs.copy()
+        # The one place UCSC parameters are stored for this track
+        set_(self, "_params", kwargs)
 
     @property
-    def _html(self):
-        if not self.html_string:
-            return None
-        _html = HTMLDoc(self.html_string, self.html_string_format)
-        _html.add_parent(self)
-        return _html
+    def kwargs(self):
+        """
+        Dictionary of the UCSC parameters set on this track.
+        """
+        return self._params
+
+    @kwargs.setter
+    def kwargs(self, kwargs):
+        self._params = kwargs
+
+    def _new_html(self):
+        return HTMLDoc(self._html_string, self._html_string_format)
 
     @property
     def trackdb(self):
@@ -268,7 +460,9 @@ class BaseTrack(HubComponent):
     def filename(self):
         if self._filename is not None:
             return self._filename
+        return self._cached("filename", self._default_filename)
 
+    def _default_filename(self):
         # If filename hasn't been assigned then make one automatically based
         # on the track name and the trackhub's filename (which, by the way,
         # acts similarly, deferring up to the genomes_file.filename . . . and
@@ -289,6 +483,14 @@ class BaseTrack(HubComponent):
     def filename(self, fn):
         self._filename = fn
 
+    @property
+    def track_field_order(self):
+        """
+        Tuple of UCSC parameter names valid for this track, in the order they
+        are rendered.
+        """
+        return self._fields.order
+
     @property
     def tracktype(self):
         return self._tracktype
@@ -300,13 +502,7 @@ class BaseTrack(HubComponent):
         need to be set as well.
         """
         self._tracktype = tracktype
-
-        # E.g., bigBed 6+3
-        base_tracktype = tracktype.split()[0]
-
-        fields = []
-        fields.extend(constants.track_fields[base_tracktype])
-        self.track_field_order = update_list(self.track_field_order, fields)
+        self._fields = fields_for(self.__class__, tracktype)
 
     def add_trackdb(self, trackdb):
         """
@@ -326,19 +522,24 @@ class BaseTrack(HubComponent):
             add_params(color='128,0,0', visibility='dense')
 
         """
+        names = self._fields.names
         for k, v in kw.items():
-            if k not in self.track_field_order and constants.VALIDATE:
-                raise ParameterError(
-                    '"{0}" is not a valid parameter for {1} with '
-                    "tracktype {2}".format(k, self.__class__.__name__, self.tracktype)
-                )
-            if not constants.param_dict[k].validate(v) and constants.VALIDATE:
+            if k not in names:
+                if settings.VALIDATE:
+                    raise ParameterError(
+                        '"{0}" is not a valid parameter for {1} with '
+                        "tracktype {2}".format(
+                            k, self.__class__.__name__, self.tracktype
+                        )
+                    )
+                continue
+            if not constants.param_dict[k].validate(v) and settings.VALIDATE:
                 raise ParameterError(
-                    'value "{0}" did not validate for parameter "{1}"'.format(k, v)
+                    'value "{0}" did not validate for parameter "{1}"'.format(v, k)
                 )
 
-        self._orig_kwargs.update(kw)
-        self.kwargs = self._orig_kwargs.copy()
+        self._params.update(kw)
+        self._mark_dirty()
 
     def remove_params(self, *args):
         """
@@ -349,8 +550,8 @@ class BaseTrack(HubComponent):
             remove_params('color', 'visibility')
         """
         for a in args:
-            self._orig_kwargs.pop(a)
-        self.kwargs = self._orig_kwargs.copy()
+            self._params.pop(a)
+        self._mark_dirty()
 
     def add_subgroups(self, subgroups):
         """
@@ -374,12 +575,43 @@ class BaseTrack(HubComponent):
             subgroups = {}
         assert isinstance(subgroups, dict)
         self.subgroups.update(subgroups)
+        self._mark_dirty()
 
     def __str__(self):
+        return "\n".join(iter_stanza_lines(self))
+
+    def _stanza_lines(self):
+        """
+        Returns the lines for just this track's stanza, without any nested
+        tracks.
+        """
+        params = self._params
+        rank = self._fields.rank
+
+        # Only the parameters that have been set need to be considered, plus
+        # "parent" and "bigDataUrl" which can be filled in automatically.
+        names = []
+        unknown = []
+        for name in params:
+            if name in rank:
+                names.append(name)
+            else:
+                unknown.append(name)
+        if "parent" not in params and isinstance(self.parent, BaseTrack):
+            names.append("parent")
+        if "bigDataUrl" not in params:
+            names.append("bigDataUrl")
+        html = None
+        if settings.DEDUPLICATE_HTML and self.html_string and "html" not in params:
+            names.append("html")
+            html = deduplicated_html_filename(
+                self.html_string, self.html_string_format
+            )
+        names.sort(key=rank.__getitem__)
+
         s = []
-        kwargs = self.kwargs.copy()
-        for name in self.track_field_order:
-            value = kwargs.pop(name, None)
+        for name in names:
+            value = params.get(name)
             if name == "parent":
                 if isinstance(self.parent, BaseTrack):
                     if value is not None:
@@ -392,6 +624,9 @@ class BaseTrack(HubComponent):
                 # fall back to `url` if set
                 value = getattr(self, "url", None)
 
+            if name == "html" and value is None:
+                value = html
+
             if value is not None:
                 if constants.param_dict[name].validate(value) or not settings.VALIDATE:
                     s.append("%s %s" % (name, value))
@@ -407,22 +642,28 @@ class BaseTrack(HubComponent):
         s.extend(self._str_subgroups())
 
         if settings.VALIDATE:
-            if len(kwargs) > 0:
+            if unknown:
                 raise ParameterError(
                     "The following parameters are unknown for track type {0}: "
-                    "{1}".format(self.tracktype, kwargs)
+                    "{1}".format(self.tracktype, dict((k, params[k]) for k in unknown))
                 )
         else:
-            for k, v in kwargs.items():
-                s.append("%s %s" % (k, v))
+            for k in unknown:
+                s.append("%s %s" % (k, params[k]))
 
-        self.kwargs = self._orig_kwargs.copy()
+        return s
 
-        return "\n".join(s)
+    def _stanza_children(self):
+        """
+        Returns the tracks nested within this one, in the order they should be
+        rendered.
+        """
+        return []
 
-    def _render(self, staging="staging"):
-        if self._html:
-            self._html.render(staging)
+    def _render(self, staging="staging", skip_unchanged=False):
+        # Tracks are written to their TrackDb; documentation is an HTMLDoc
+        # child rendered on its own.
+        pass
 
     def _str_subgroups(self):
         """
@@ -449,6 +690,8 @@ class BaseTrack(HubComponent):
 
 
 class Track(BaseTrack):
+    __slots__ = ("_url",)
+
     def __init__(self, url=None, *args, **kwargs):
         """
         Represents a single track stanza along with the file it describes.
@@ -474,12 +717,15 @@ class Track(BaseTrack):
 
         kwargs["bigDataUrl"] = kwargs.get("bigDataUrl", url)
         super(Track, self).__init__(*args, **kwargs)
-        self._url = kwargs["bigDataUrl"]
+        object.__setattr__(self, "_url", kwargs["bigDataUrl"])
 
     @property
     def url(self):
         if self._url is not None:
             return self._url
+        return self._cached("url", self._default_url)
+
+    def _default_url(self):
         if self.filename is None:
             return None
         return os.path.relpath(
@@ -492,6 +738,9 @@ class Track(BaseTrack):
 
 
 class CompositeTrack(BaseTrack):
+    __slots__ = ("subtracks", "views")
+    _field_groups = ("compositeTrack", "subGroups")
+
     def __init__(self, *args, **kwargs):
         """
         Represents a composite track.  Subclasses :class:`BaseTrack`, and adds
@@ -509,13 +758,6 @@ class CompositeTrack(BaseTrack):
         """
         super(CompositeTrack, self).__init__(*args, **kwargs)
 
-        self.track_field_order = update_list(
-            self.track_field_order, constants.track_fields["compositeTrack"]
-        )
-        self.track_field_order = update_list(
-            self.track_field_order, constants.track_fields["subGroups"]
-        )
-
         # TODO: are subtracks and views mutually exclusive, or can a composite
         # have both "view-ed" and "non-view-ed" subtracks?
         self.subtracks = []
@@ -610,26 +852,19 @@ class CompositeTrack(BaseTrack):
             s.append("subGroup%s %s" % (i, subgroup))
         return s
 
-    def __str__(self):
-
-        s = []
-
-        s.append(super(CompositeTrack, self).__str__())
+    def _stanza_lines(self):
+        s = super(CompositeTrack, self)._stanza_lines()
         s.append("compositeTrack on")
+        return s
 
-        for view in self.views:
-            s.append("")
-            for line in str(view).splitlines(False):
-                s.append(constants.INDENT + line)
-
-        for subtrack in self.subtracks:
-            s.append("")
-            for line in str(subtrack).splitlines(False):
-                s.append(constants.INDENT + line)
-        return "\n".join(s)
+    def _stanza_children(self):
+        return self.views + self.subtracks
 
 
 class ViewTrack(BaseTrack):
+    __slots__ = ("view", "subtracks")
+    _field_groups = ("view",)
+
     def __init__(self, view, *args, **kwargs):
         """
         Represents a View track.  Subclasses :class:`BaseTrack`, and adds some
@@ -656,9 +891,6 @@ class ViewTrack(BaseTrack):
         self.view = view
         kwargs["view"] = view
         super(ViewTrack, self).__init__(*args, **kwargs)
-        self.track_field_order = update_list(
-            self.track_field_order, constants.track_fields["view"]
-        )
         self.subtracks = []
 
     def add_tracks(self, *args):
@@ -679,18 +911,14 @@ class ViewTrack(BaseTrack):
                 self.add_child(track)
                 self.subtracks.append(track)
 
-    def __str__(self):
-        s = []
-        s.append(super(ViewTrack, self).__str__())
-
-        for subtrack in self.subtracks:
-            s.append("")
-            for line in str(subtrack).splitlines(False):
-                s.append(constants.INDENT + line)
-        return "\n".join(s)
+    def _stanza_children(self):
+        return self.subtracks
 
 
 class SuperTrack(BaseTrack):
+    __slots__ = ("subtracks",)
+    _field_groups = ("superTrack",)
+
     def __init__(self, *args, **kwargs):
         """
         Represents a Super track. Subclasses :class:`Track`, and adds some
@@ -706,9 +934,6 @@ class SuperTrack(BaseTrack):
         See :class:`BaseTrack` for details on arguments.
         """
         super(SuperTrack, self).__init__(tracktype="superTrack", *args, **kwargs)
-        self.track_field_order = update_list(
-            self.track_field_order, constants.track_fields["superTrack"]
-        )
 
         self.subtracks = []
 
@@ -729,21 +954,19 @@ class SuperTrack(BaseTrack):
                 self.add_child(track)
                 self.subtracks.append(track)
 
-    def __str__(self):
-
-        s = []
-
-        s.append(super(SuperTrack, self).__str__())
+    def _stanza_lines(self):
+        s = super(SuperTrack, self)._stanza_lines()
         s.append("superTrack on")
+        return s
 
-        for subtrack in self.subtracks:
-            s.append("")
-            for line in str(subtrack).splitlines(False):
-                s.append(constants.INDENT + line)
-        return "\n".join(s)
+    def _stanza_children(self):
+        return self.subtracks
 
 
 class AggregateTrack(BaseTrack):
+    __slots__ = ("aggregate", "subtracks")
+    _field_groups = ("multiWig",)
+
     def __init__(self, aggregate, *args, **kwargs):
         """
         Represents an Aggregate or Overlay track. Subclasses :class:`Track`,
@@ -772,9 +995,6 @@ class AggregateTrack(BaseTrack):
         self.aggregate = aggregate
         kwargs["aggregate"] = aggregate
         super(AggregateTrack, self).__init__(*args, **kwargs)
-        self.track_field_order = update_list(
-            self.track_field_order, constants.track_fields["multiWig"]
-        )
         self.subtracks = []
 
     def add_subtrack(self, subtrack):
@@ -801,21 +1021,18 @@ class AggregateTrack(BaseTrack):
                 self.add_child(track)
                 self.subtracks.append(track)
 
-    def __str__(self):
-
-        s = []
-
-        s.append(super(AggregateTrack, self).__str__())
+    def _stanza_lines(self):
+        s = super(AggregateTrack, self)._stanza_lines()
         s.append("container multiWig")
+        return s
 
-        for subtrack in self.subtracks:
-            s.append("")
-            for line in str(subtrack).splitlines(False):
-                s.append(constants.INDENT + line)
-        return "\n".join(s)
+    def _stanza_children(self):
+        return self.subtracks
 
 
 class HTMLDoc(HubComponent):
+    _owns_file = True
+
     def __init__(self, contents, html_string_format, filename=None):
         """
         Represents an HTML file used for documentation.
@@ -849,12 +1066,29 @@ class HTMLDoc(HubComponent):
     def filename(self):
         if self._filename is not None:
             return self._filename
+        return self._cached(
+            ("filename", settings.DEDUPLICATE_HTML), self._default_filename
+        )
+
+    def _default_filename(self):
         if self.trackdb is None or self.track is None:
             return None
+        if settings.DEDUPLICATE_HTML:
+            return os.path.join(
+                os.path.dirname(self.trackdb.filename),
+                deduplicated_html_filename(self.contents, self.html_string_format),
+            )
         return os.path.join(
             os.path.dirname(self.trackdb.filename), self.track.name + ".html"
         )
 
+    def _deduplicated(self):
+        """
+        True if this document is written to a file shared by all identical
+        documents (see `settings.DEDUPLICATE_HTML`).
+        """
+        return settings.DEDUPLICATE_HTML and self._filename is None
+
     @filename.setter
     def filename(self, fn):
         self._filename = fn
@@ -870,15 +1104,15 @@ class HTMLDoc(HubComponent):
     def track(self):
         return self.parent
 
-    def _render(self, staging="staging"):
+    def _render(self, staging="staging", skip_unchanged=False):
         self.validate()
-        dirname = os.path.dirname(self.filename)
-        if not os.path.exists(dirname):
-            os.makedirs(dirname)
-        fout = open(os.path.join(staging, self.filename), "w")
-        fout.write(str(self))
-        fout.close()
-        return fout.name
+        session = base._session
+        if session is not None and self._deduplicated():
+            # Only the first of any identical documents needs to be written
+            rendered_filename = os.path.join(staging, self.filename)
+            if session.claimed.setdefault(rendered_filename, self) is not self:
+                return None if skip_unchanged else rendered_filename
+        return self._write_rendered(staging, skip_unchanged=skip_unchanged)
 
     def validate(self):
         if not self.trackdb:
@@ -893,16 +1127,7 @@ class HTMLDoc(HubComponent):
         if self.html_string_format == "html":
             return self.contents
         elif self.html_string_format == "rst":
-
-            # docutils still internally uses a "U" mode for opening files.
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                parts = publish_parts(
-                    self.contents,
-                    writer_name="html",
-                    settings_overrides={"output_encoding": "unicode"},
-                )
-            return parts["html_body"]
+            return html_cache.rst_to_html(self.contents)
         else:
             raise ValueError(
                 "html_string_format '{}' not supported".format(self.html_string_format)
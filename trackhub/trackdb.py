@@ -1,13 +1,101 @@
 from __future__ import absolute_import
 
+import io
 import os
+from collections import OrderedDict
+from . import base
 from .base import HubComponent
 from .genomes_file import GenomesFile
 from .hub import Hub
 from .genome import Genome
+from .track import iter_stanza_lines, fields_for, _invalid_name, ParameterError
+from .validate import validate_column, ValidationError
+from .compatibility import string_types
+from . import settings
+
+# Columns used as arguments when creating tracks in bulk (see
+# TrackDb.add_columns); all other columns are UCSC parameters.
+_TRACK_ARGS = frozenset(
+    [
+        "name",
+        "tracktype",
+        "short_label",
+        "long_label",
+        "subgroups",
+        "source",
+        "filename",
+        "html_string",
+        "html_string_format",
+        "url",
+        "view",
+        "aggregate",
+    ]
+)
+
+
+def _format_stanzas(tracks):
+    """
+    Returns a list of the formatted stanzas (including nested stanzas) for
+    each track in `tracks`.
+    """
+    return [
+        "".join(line.rstrip() + "\n" for line in iter_stanza_lines(track))
+        for track in tracks
+    ]
+
+
+def _invalid_rows(cls, columns, n):
+    """
+    Returns a dict of {row index: reason} for rows of `columns` that would not
+    make valid tracks of class `cls`.
+    """
+    invalid = {}
+    for i, name in enumerate(columns["name"]):
+        if not isinstance(name, string_types) or _invalid_name.search(name):
+            invalid.setdefault(i, 'invalid name "{0}"'.format(name))
+
+    # Parameters valid for each distinct track type
+    tracktypes = columns.get("tracktype", [None] * n)
+    fields = {}
+    for tracktype in set(tracktypes):
+        try:
+            fields[tracktype] = fields_for(cls, tracktype).names
+        except (AttributeError, KeyError):
+            fields[tracktype] = None
+    for i, tracktype in enumerate(tracktypes):
+        if fields[tracktype] is None:
+            invalid.setdefault(i, 'invalid tracktype "{0}"'.format(tracktype))
+
+    for key, values in columns.items():
+        if key in _TRACK_ARGS:
+            continue
+        try:
+            mask, failed = validate_column(key, values)
+        except ValidationError:
+            raise ParameterError('"{0}" is not a known parameter'.format(key))
+        for i in failed:
+            invalid.setdefault(
+                int(i),
+                'value "{0}" did not validate for parameter "{1}"'.format(
+                    values[i], key
+                ),
+            )
+        if all(names is None or key in names for names in fields.values()):
+            continue
+        for i, (tracktype, value) in enumerate(zip(tracktypes, values)):
+            names = fields[tracktype]
+            if value is not None and names is not None and key not in names:
+                invalid.setdefault(
+                    i,
+                    '"{0}" is not a valid parameter for {1} with '
+                    "tracktype {2}".format(key, cls.__name__, tracktype),
+                )
+    return invalid
 
 
 class TrackDb(HubComponent):
+    _owns_file = True
+
     def __init__(self, tracks=None, filename=None):
         """
         Represents the file containing one or more Track objects (which each
@@ -57,7 +145,9 @@ class TrackDb(HubComponent):
     def filename(self):
         if self._filename is not None:
             return self._filename
+        return self._cached("filename", self._default_filename)
 
+    def _default_filename(self):
         if self.genome is None:
             return None
 
@@ -96,34 +186,188 @@ class TrackDb(HubComponent):
                 self.add_child(t)
                 self._tracks.append(t)
 
+    @classmethod
+    def from_records(cls, records, track_class=None, on_error="raise", **kwargs):
+        """
+        Creates a TrackDb containing one track per record.
+
+        See :meth:`add_records` for details on the arguments; additional
+        keyword arguments are passed to the TrackDb constructor.
+        """
+        trackdb = cls(**kwargs)
+        trackdb.add_records(records, track_class=track_class, on_error=on_error)
+        return trackdb
+
+    @classmethod
+    def from_columns(cls, columns, track_class=None, on_error="raise", **kwargs):
+        """
+        Creates a TrackDb containing one track per row of `columns`.
+
+        See :meth:`add_columns` for details on the arguments; additional
+        keyword arguments are passed to the TrackDb constructor.
+        """
+        trackdb = cls(**kwargs)
+        trackdb.add_columns(columns, track_class=track_class, on_error=on_error)
+        return trackdb
+
+    def add_records(self, records, track_class=None, on_error="raise"):
+        """
+        Creates and adds one track per record.
+
+        Parameters
+        ----------
+
+        records : iterable of dict
+            Each record is a dictionary of keyword arguments for one track,
+            e.g. `{"name": "sample1", "tracktype": "bigWig", "source":
+            "sample1.bw", "color": "128,0,0"}`. Keys missing from a record are
+            treated as None.
+
+        See :meth:`add_columns` for details on the other arguments and the
+        return value.
+        """
+        records = list(records)
+        keys = OrderedDict()
+        for record in records:
+            keys.update(dict.fromkeys(record))
+        columns = dict((k, [record.get(k) for record in records]) for k in keys)
+        return self.add_columns(columns, track_class=track_class, on_error=on_error)
+
+    def add_columns(self, columns, track_class=None, on_error="raise"):
+        """
+        Creates and adds one track per row of `columns`.
+
+        This is much faster than creating tracks one at a time when building
+        hubs from large tables (e.g. sample sheets). Parameters are validated
+        a column at a time (see :func:`trackhub.validate.validate_column`),
+        before any tracks are created.
+
+        Parameters
+        ----------
+
+        columns : dict
+            Maps argument names to equal-length sequences (lists, numpy arrays,
+            etc) with one value per track. A "name" column is required. Columns
+            named after arguments to the track class ("name", "tracktype",
+            "source", "url", "subgroups", etc.) are passed as those arguments
+            and all others are UCSC parameters. None means the argument or
+            parameter is not set for that row.
+
+        track_class : class
+            Class of track to create. Default is :class:`Track`.
+
+        on_error : "raise" or "skip"
+            If "raise", a ParameterError describing the invalid rows is raised
+            and no tracks are added. If "skip", invalid rows are skipped and
+            all others are added. Has no effect if `settings.VALIDATE` is
+            False.
+
+        Returns
+        -------
+        Sorted list of the indices of skipped rows.
+        """
+        from trackhub import Track
+
+        if on_error not in ("raise", "skip"):
+            raise ValueError('on_error must be "raise" or "skip"')
+        if track_class is None:
+            track_class = Track
+        if "name" not in columns:
+            raise ValueError('A "name" column is required')
+
+        columns = dict(
+            (k, v.tolist() if hasattr(v, "tolist") else list(v))
+            for k, v in columns.items()
+        )
+        lengths = set(len(v) for v in columns.values())
+        if len(lengths) > 1:
+            raise ValueError("Columns must all have the same length")
+        n = lengths.pop()
+
+        invalid = {}
+        if settings.VALIDATE:
+            invalid = _invalid_rows(track_class, columns, n)
+        if invalid and on_error == "raise":
+            rows = sorted(invalid)
+            raise ParameterError(
+                "{0} invalid row(s): {1}{2}".format(
+                    len(rows),
+                    "; ".join(
+                        "row {0}: {1}".format(i, invalid[i]) for i in rows[:10]
+                    ),
+                    "; ..." if len(rows) > 10 else "",
+                )
+            )
+
+        keys = list(columns)
+        tracks = []
+        for i, row in enumerate(zip(*[columns[k] for k in keys])):
+            if i in invalid:
+                continue
+            tracks.append(
+                track_class(
+                    **dict((k, v) for k, v in zip(keys, row) if v is not None)
+                )
+            )
+        self.add_tracks(tracks)
+        return sorted(invalid)
+
     @property
     def tracks(self):
         from trackhub import Track
 
-        return [i for i, level in self.leaves(Track)]
+        return list(self.instances(Track))
 
     def add_genome(self, genome):
         self.add_parent(genome)
 
     def __str__(self):
+        fout = io.StringIO()
+        self.write(fout)
+        return fout.getvalue()
+
+    def write(self, fout):
+        """
+        Writes the contents of the trackDb file to `fout`.
+
+        Lines are written one at a time as they are generated, so the full
+        contents are never held in memory.
+
+        When called while rendering with multiple workers (see
+        :meth:`HubComponent.render`), stanzas are instead formatted in chunks by
+        the worker threads and then written in order.
+
+        Parameters
+        ----------
+
+        fout : file-like
+            Any object with a `write()` method, typically a file opened for
+            writing.
+        """
         self.validate()
-        s = []
-        for track in self._tracks:
-            for line in str(track).splitlines(False):
-                line = line.rstrip()
-                s.append(line)
-            s.append("")
+        session = base._session
+        if session is not None and session.executor is not None:
+            tracks = self._tracks
+            size = max(1, -(-len(tracks) // (4 * session.workers)))
+            chunks = [tracks[i : i + size] for i in range(0, len(tracks), size)]
+            first = True
+            for stanzas in session.executor.map(_format_stanzas, chunks):
+                for stanza in stanzas:
+                    if not first:
+                        fout.write("\n")
+                    first = False
+                    fout.write(stanza)
+            return
 
-        return "\n".join(s)
+        for i, track in enumerate(self._tracks):
+            if i:
+                fout.write("\n")
+            for line in iter_stanza_lines(track):
+                fout.write(line.rstrip() + "\n")
 
     def validate(self):
         if len(self.children) == 0:
             raise ValueError("No Track objects specified")
 
-    def _render(self, staging="staging"):
-        rendered_filename = os.path.join(staging, self.filename)
-        self.makedirs(rendered_filename)
-        fout = open(rendered_filename, "w")
-        fout.write(str(self))
-        fout.close()
-        return fout.name
+    def _render(self, staging="staging", skip_unchanged=False):
+        return self._write_rendered(staging, skip_unchanged=skip_unchanged)
@@ -1,25 +1,73 @@
 import tempfile
 import os
 import sys
+import json
+import errno
+import functools
+import time
 import shlex
+import shutil
+import heapq
+import hashlib
+import contextlib
 import subprocess as sp
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from . import track
 from . import genome
 from . import base
 from . import trackdb
 from . import compatibility
+from . import settings
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 RSYNC_OPTIONS = "--progress -rvL"
 
+# Used by upload_hub() when the staging directory holds no symlinks
+RSYNC_OPTIONS_NO_SYMLINKS = "--progress -rv"
 
-def run(cmds, **kwargs):
+# Ways of placing source files in a staging directory, each mapped to the
+# methods tried for each file in turn: "hardlink" only works when the source
+# is on the same filesystem as the staging directory, and "reflink" (a
+# copy-on-write clone) only on filesystems that support it, such as Btrfs and
+# XFS on Linux.
+LINK_METHODS = {
+    "symlink": ("symlink",),
+    "hardlink": ("hardlink", "copy"),
+    "reflink": ("reflink", "copy"),
+    "copy": ("copy",),
+    "auto": ("hardlink", "reflink", "copy"),
+}
+
+# ioctl request for cloning a file on Linux (FICLONE in linux/fs.h)
+_FICLONE = 0x40049409
+
+
+class UploadError(Exception):
+    """
+    Raised by :func:`upload_shards` if any of the rsync processes failed.
+
+    `errors` is a list of (shard, exception) for the shards that failed, and
+    `uploaded` lists the paths in the shards that were uploaded successfully.
+    """
+
+    def __init__(self, errors, uploaded):
+        self.errors = errors
+        self.uploaded = uploaded
+        msg = "{0} of the rsync processes failed: {1}".format(
+            len(errors), "; ".join(str(e) for _, e in errors)
+        )
+        super(UploadError, self).__init__(msg)
+
+
+def run(cmds, prefix="", **kwargs):
     """
     Wrapper around subprocess.run, with unicode decoding of output.
 
+    Each line of output is printed with `prefix` added to the start.
+
     Additional kwargs are passed to subprocess.run.
     """
     proc = sp.Popen(
@@ -30,7 +78,7 @@ def run(cmds, **kwargs):
         close_fds=sys.platform != "win32",
     )
     for line in proc.stdout:
-        print(line[:-1].decode())
+        print(prefix + line[:-1].decode())
     retcode = proc.wait()
     if retcode:
         raise sp.CalledProcessError(retcode, cmds)
@@ -53,9 +101,8 @@ def symlink(target, linkname):
     if not os.path.exists(link_dir):
         os.makedirs(link_dir)
 
-    if os.path.exists(linkname):
-        if os.path.islink(linkname):
-            os.remove(linkname)
+    if os.path.islink(linkname):
+        os.remove(linkname)
 
     os.symlink(target, linkname)
 
@@ -76,7 +123,29 @@ def symlink(target, linkname):
     return linkname
 
 
-def upload(host, user, local_dir, remote_dir, rsync_options=RSYNC_OPTIONS):
+def remote_string(host, user, remote_dir):
+    """
+    Returns the rsync destination for `remote_dir` on `host` as `user` (either
+    of which may be None), with a trailing "/".
+    """
+    if user is None:
+        user = ""
+    else:
+        user = user + "@"
+    if host is None or host == "localhost":
+        host = ""
+    else:
+        host = host + ":"
+
+    if not remote_dir.endswith("/"):
+        remote_dir = remote_dir + "/"
+
+    return "{user}{host}{remote_dir}".format(**locals())
+
+
+def upload(
+    host, user, local_dir, remote_dir, rsync_options=RSYNC_OPTIONS, files=None
+):
     """
     Upload a file or directory via rsync.
 
@@ -93,28 +162,168 @@ def upload(host, user, local_dir, remote_dir, rsync_options=RSYNC_OPTIONS):
 
     remote_dir : str
         If a directory, a trailing "/" will be added.
+
+    files : list or None
+        If provided, only these paths (relative to `local_dir`) are uploaded,
+        passed to rsync with ``--files-from`` so that it doesn't need to scan
+        the rest of `local_dir` or `remote_dir`. By default everything in
+        `local_dir` is uploaded.
+
+    A staging :class:`Manifest` in `local_dir` is never uploaded.
     """
-    if user is None:
-        user = ""
-    else:
-        user = user + "@"
-    if host is None or host == "localhost":
-        host = ""
-    else:
-        host = host + ":"
+    remote = remote_string(host, user, remote_dir)
+    _rsync(local_dir, remote, rsync_options, files)
+    return [remote]
 
+
+def _rsync(local_dir, remote, rsync_options, files, **kwargs):
+    """
+    Runs rsync for upload() and upload_shards(); kwargs are passed to run().
+    """
     if not local_dir.endswith("/"):
         local_dir = local_dir + "/"
 
-    if not remote_dir.endswith("/"):
-        remote_dir = remote_dir + "/"
-
-    remote_string = "{user}{host}{remote_dir}".format(**locals())
     cmds = ["rsync"]
     cmds += shlex.split(rsync_options)
-    cmds += [local_dir, remote_string]
-    run(cmds)
-    return [remote_string]
+    cmds += ["--exclude", "/" + Manifest.filename]
+    if files is None:
+        cmds += [local_dir, remote]
+        run(cmds, **kwargs)
+        return
+
+    # NUL-separated, so that any filename can be listed
+    fd, files_from = tempfile.mkstemp(suffix=".files")
+    try:
+        with os.fdopen(fd, "w") as fout:
+            fout.write("".join(i + "\0" for i in files))
+        cmds += ["--from0", "--files-from", files_from, local_dir, remote]
+        run(cmds, **kwargs)
+    finally:
+        os.remove(files_from)
+
+
+def partition(sizes, n, key=None):
+    """
+    Splits files into at most `n` shards of similar total size.
+
+    Files are assigned largest first, each to the shard with the smallest
+    total so far.
+
+    Parameters
+    ----------
+
+    sizes : dict
+        Maps each path to its size
+
+    n : int
+        Number of shards
+
+    key : callable or None
+        If provided, files for which ``key(path)`` is the same are kept in the
+        same shard; for example :func:`genome_key` keeps each genome's files
+        together.
+
+    Returns a list of shards, largest first, each a sorted list of paths.
+    """
+    groups = OrderedDict()
+    for path, size in sizes.items():
+        group = groups.setdefault(path if key is None else key(path), [0, []])
+        group[0] += size
+        group[1].append(path)
+
+    shards = [(0, i, []) for i in range(max(n, 1))]
+    for size, paths in sorted(groups.values(), key=lambda g: -g[0]):
+        total, i, shard = heapq.heappop(shards)
+        shard.extend(paths)
+        heapq.heappush(shards, (total + size, i, shard))
+    shards.sort(key=lambda s: (-s[0], s[1]))
+    return [sorted(shard) for _, _, shard in shards if shard]
+
+
+def genome_key(path):
+    """
+    Returns the top-level directory of `path` (the genome, for hubs laid out
+    as by :func:`trackhub.default_hub`), or "" for top-level files.
+    """
+    return path.split("/", 1)[0] if "/" in path else ""
+
+
+def upload_shards(
+    host, user, local_dir, remote_dir, shards, rsync_options=RSYNC_OPTIONS, jobs=None
+):
+    """
+    Uploads files from `local_dir` with one rsync process per shard, running
+    up to `jobs` at a time.
+
+    `shards` is a list of lists of paths relative to `local_dir`, such as
+    returned by :func:`partition`. `jobs` defaults to the number of shards.
+    Output of each rsync process is printed prefixed with its shard number,
+    and completed shards are logged. If any rsync process fails, the others
+    still run to completion, and then :class:`UploadError` is raised.
+
+    Returns the paths uploaded.
+    """
+    remote = remote_string(host, user, remote_dir)
+    if jobs is None:
+        jobs = len(shards)
+    total = sum(len(shard) for shard in shards)
+    uploaded = []
+    errors = []
+    with ThreadPoolExecutor(max(jobs, 1)) as executor:
+        futures = {}
+        for i, shard in enumerate(shards):
+            prefix = "[{0}/{1}] ".format(i + 1, len(shards))
+            future = executor.submit(
+                _rsync, local_dir, remote, rsync_options, shard, prefix=prefix
+            )
+            futures[future] = (i, shard)
+        for future in as_completed(futures):
+            i, shard = futures[future]
+            try:
+                future.result()
+            except (sp.CalledProcessError, OSError) as e:
+                logger.error("Shard %d of %d failed: %s", i + 1, len(shards), e)
+                errors.append((shard, e))
+                continue
+            uploaded.extend(shard)
+            logger.info(
+                "Uploaded shard %d of %d (%d files); %d of %d files done",
+                i + 1,
+                len(shards),
+                len(shard),
+                len(uploaded),
+                total,
+            )
+    if errors:
+        raise UploadError(errors, uploaded)
+    return uploaded
+
+
+def _staged_sizes(staging, workers=None):
+    """
+    Returns a dictionary of the size of each file in `staging` (following
+    symlinks), keyed by path relative to `staging`.
+    """
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(staging):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, staging)
+            if relpath != Manifest.filename:
+                paths.append(relpath)
+    if workers is None:
+        workers = settings.STAGING_WORKERS
+    stats = _stat_all([os.path.join(staging, i) for i in paths], workers)
+    return OrderedDict((i, st.st_size) for i, st in zip(paths, stats))
+
+
+def _shard_key(shard_by):
+    if shard_by == "size":
+        return None
+    if shard_by == "genome":
+        return genome_key
+    raise ValueError('shard_by must be "size" or "genome", not {0!r}'.format(shard_by))
 
 
 def local_link(local_fn, remote_fn, staging):
@@ -145,91 +354,802 @@ def local_link(local_fn, remote_fn, staging):
     return symlink(local_fn, linkname)
 
 
-def stage(x, staging):
+def stage(x, staging, manifest=None, skip_unchanged=False, links=None):
     """
     Stage an object to the `staging` directory.
 
+    Only `x` itself is rendered, not its children, so that walking a hub with
+    :meth:`HubComponent.leaves` renders each component exactly once.
+
     If the object is a Track and is one of the types that needs an index file
     (bam, vcfTabix), then the index file will be staged as well.
 
+    Parameters
+    ----------
+
+    x : HubComponent
+        Object to stage
+
+    staging : str
+        Staging directory
+
+    manifest : OrderedDict or None
+        If provided, maps every file already staged to its source (None for
+        rendered files). Files already in the manifest will not be written
+        again, and newly-staged files will be added to it.
+
+    skip_unchanged : bool
+        If True, rendered files whose contents have not changed since they
+        were last written to `staging` are left untouched and are not
+        reported.
+
+    links : list or None
+        If provided, source files are not linked; instead (source, linkname)
+        is appended to `links` for each, to be linked in a batch later.
+
     Returns a list of the linknames created.
     """
+    if manifest is None:
+        manifest = OrderedDict()
     linknames = []
 
-    # Objects that don't represent a file shouldn't be staged
-    non_file_objects = (
-        track.ViewTrack,
-        track.CompositeTrack,
-        track.AggregateTrack,
-        track.SuperTrack,
-        genome.Genome,
+    # If it's an object representing a file, then render it.
+    x.validate()
+    rendered = x._render(staging, skip_unchanged=skip_unchanged)
+    if rendered and rendered not in manifest:
+        manifest[rendered] = None
+        linknames.append(rendered)
+
+    for source, filename in _sources(x):
+        linkname = os.path.abspath(os.path.join(staging, filename.lstrip(os.path.sep)))
+        if linkname in manifest:
+            continue
+        manifest[linkname] = source
+        if links is None:
+            linknames.append(local_link(source, filename, staging))
+        else:
+            links.append((os.path.abspath(source), linkname))
+            linknames.append(linkname)
+
+    return linknames
+
+
+# Objects that don't represent a file shouldn't be staged
+_NON_FILE_OBJECTS = (
+    track.ViewTrack,
+    track.CompositeTrack,
+    track.AggregateTrack,
+    track.SuperTrack,
+    genome.Genome,
+)
+
+
+def _sources(x):
+    """
+    Yields (source, filename) for each local file that staging `x` links into
+    the staging directory: its source file and, for bam and vcfTabix tracks,
+    the index file.
+    """
+    if isinstance(x, _NON_FILE_OBJECTS):
+        return
+    if not (hasattr(x, "source") and hasattr(x, "filename")):
+        return
+
+    # A remote track hosted elsewhere does not need staging. This is defined
+    # by a track with a url, but no source or filename.
+    if x.source is None and x.filename is None and getattr(x, "url", None) is not None:
+        return
+
+    yield x.source, x.filename
+
+    if isinstance(x, track.Track):
+        if x.tracktype == "bam":
+            yield x.source + ".bai", x.filename + ".bai"
+        if x.tracktype == "vcfTabix":
+            yield x.source + ".tbi", x.filename + ".tbi"
+
+
+def _map(func, items, workers):
+    """
+    Returns ``[func(i) for i in items]``, with the calls spread over a pool of
+    `workers` threads in chunks.
+    """
+    if workers is None or workers <= 1 or len(items) < 2:
+        return [func(i) for i in items]
+
+    def run_chunk(chunk):
+        return [func(i) for i in chunk]
+
+    size = -(-len(items) // (4 * workers))
+    chunks = [items[i : i + size] for i in range(0, len(items), size)]
+    results = []
+    with ThreadPoolExecutor(workers) as executor:
+        for chunk_results in executor.map(run_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+@contextlib.contextmanager
+def _phase(timings, name):
+    """
+    Adds the time spent in the block to `timings[name]`.
+    """
+    t0 = time.time()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.time() - t0
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _stat_all(paths, workers):
+    """
+    Returns os.stat() results for each of `paths`, raising ValueError if any
+    don't exist.
+    """
+    stats = _map(_stat, paths, workers)
+    missing = [path for path, st in zip(paths, stats) if st is None]
+    if missing:
+        msg = "target {} not found".format(missing[0])
+        if len(missing) > 1:
+            msg += " (and {} other missing targets)".format(len(missing) - 1)
+        raise ValueError(msg)
+    return stats
+
+
+def _symlink(source, linkname, st, dev):
+    """
+    Symlinks `source` to `linkname`, replacing any existing file, and gives
+    the link the modification time of the source, as symlink() intends to.
+    """
+    try:
+        os.symlink(source, linkname)
+    except FileExistsError:
+        _replace(os.symlink, source, linkname)
+    try:
+        os.utime(linkname, (st.st_mtime, st.st_mtime), follow_symlinks=False)
+    except (NotImplementedError, PermissionError):
+        pass
+
+
+def _hardlink(source, linkname, st, dev):
+    if st.st_dev != dev:
+        raise OSError(errno.EXDEV, "source is on another filesystem", source)
+    try:
+        if os.path.samestat(os.lstat(linkname), st):
+            return
+    except OSError:
+        pass
+    _replace(os.link, source, linkname)
+
+
+def _reflink(source, linkname, st, dev):
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are only supported on Linux")
+    import fcntl
+
+    def clone(source, tmp):
+        with open(source, "rb") as fin, open(tmp, "wb") as fout:
+            fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+        shutil.copystat(source, tmp)
+
+    _replace(clone, source, linkname)
+
+
+def _copy(source, linkname, st, dev):
+    _replace(shutil.copy2, source, linkname)
+
+
+def _replace(func, source, linkname):
+    """
+    Calls ``func(source, tmp)`` to create a temporary file next to `linkname`,
+    and then moves it into place. Any existing file at `linkname` is replaced
+    rather than written to, since it may be a hard link to a source file.
+    """
+    tmp = linkname + ".trackhub-tmp"
+    try:
+        func(source, tmp)
+        os.replace(tmp, linkname)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+
+
+_LINKERS = {
+    "symlink": _symlink,
+    "hardlink": _hardlink,
+    "reflink": _reflink,
+    "copy": _copy,
+}
+
+
+def _link(methods, devices, item):
+    """
+    Places a source file in the staging directory with the first of `methods`
+    that works for it, and returns the method used. Used by _link_all().
+    """
+    source, linkname, st = item
+    dev = devices[os.path.dirname(linkname)]
+    for method in methods[:-1]:
+        try:
+            _LINKERS[method](source, linkname, st, dev)
+            return method
+        except OSError:
+            continue
+    _LINKERS[methods[-1]](source, linkname, st, dev)
+    return methods[-1]
+
+
+def _link_methods(link_method):
+    if link_method is None:
+        link_method = settings.STAGING_LINK_METHOD
+    try:
+        return LINK_METHODS[link_method]
+    except KeyError:
+        raise ValueError(
+            "link_method must be one of {0}, not {1!r}".format(
+                sorted(LINK_METHODS), link_method
+            )
+        )
+
+
+def _link_all(links, workers, timings, methods=("symlink",)):
+    """
+    Places source files in the staging directory for a list of (source,
+    linkname, os.stat(source)), and returns the method (see LINK_METHODS) used
+    for each.
+
+    The directories needed are created first, once each, and then the files
+    are linked by a pool of `workers` threads. Time spent in each phase is
+    added to the `timings` dictionary.
+    """
+    with _phase(timings, "mkdir"):
+        devices = {}
+        for dirname in sorted(set(os.path.dirname(i[1]) for i in links)):
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname, exist_ok=True)
+            devices[dirname] = os.stat(dirname).st_dev
+    with _phase(timings, "link"):
+        return _map(functools.partial(_link, methods, devices), links, workers)
+
+
+def _log_timings(staging, timings):
+    logger.info(
+        "Staged %s: %s",
+        staging,
+        ", ".join("{0} {1:.2f}s".format(k, v) for k, v in timings.items()),
     )
-    if isinstance(x, non_file_objects):
-        return linknames
 
-    # If it's an object representing a file, then render it.
-    #
-    # Track objects don't represent files, but their documentation does
-    linknames.append(x.render(staging))
 
-    if hasattr(x, "source") and hasattr(x, "filename"):
+class Manifest(object):
+    """
+    Record of the files in a persistent staging directory, which lets staging
+    a hub again only touch the files that changed (see :func:`stage_hub`).
+
+    The manifest is kept in the staging directory itself as
+    `Manifest.filename`, which :func:`upload` excludes from uploads.
+
+    Attributes
+    ----------
+
+    entries : OrderedDict
+        Maps each staged file's path, relative to the staging directory (and
+        so to the remote directory), to a dictionary with its "source" (None
+        for rendered hub files), "size", "mtime", "hash", and "link", the
+        method used to place a source file (see :data:`LINK_METHODS`; None for
+        rendered hub files). Source files are recognized by their size and
+        modification time; only rendered files, which are small, have their
+        contents hashed.
+
+    changed : list
+        Paths added or updated by the last call to :meth:`update`.
+
+    removed : list
+        Paths removed by the last call to :meth:`update`.
+
+    remotes : dict
+        For each remote directory (see :func:`remote_string`) the hub has been
+        uploaded to, maps each path to the state of its entry when it was last
+        uploaded there (see :meth:`pending` and :meth:`mark_uploaded`).
+    """
+
+    filename = ".trackhub-manifest.json"
+    version = 1
+
+    def __init__(self, staging):
+        self.staging = staging
+        self.entries = OrderedDict()
+        self.changed = []
+        self.removed = []
+        self.remotes = {}
+
+    @classmethod
+    def load(cls, staging):
+        """
+        Returns the manifest saved in `staging`, or an empty one if there is
+        none (or it can't be read).
+        """
+        manifest = cls(staging)
+        try:
+            with open(os.path.join(staging, cls.filename)) as fin:
+                data = json.loads(fin.read())
+        except (IOError, OSError, ValueError):
+            return manifest
+        if data.get("version") == cls.version:
+            manifest.entries = data["entries"]
+            manifest.remotes = data.get("remotes", {})
+        return manifest
+
+    def save(self):
+        """
+        Writes the manifest to the staging directory.
+        """
+        # json.dumps is much faster than json.dump for large manifests
+        data = json.dumps(
+            {"version": self.version, "entries": self.entries, "remotes": self.remotes}
+        )
+        fd, tmp = tempfile.mkstemp(dir=self.staging, suffix=".tmp")
+        with os.fdopen(fd, "w") as fout:
+            fout.write(data)
+        os.replace(tmp, os.path.join(self.staging, self.filename))
+
+    def path(self, relpath):
+        """
+        Returns the absolute path of staged file `relpath`.
+        """
+        return os.path.abspath(os.path.join(self.staging, relpath))
+
+    def pending(self, remote):
+        """
+        Returns the paths that have been added or changed since the last
+        upload to `remote`, or None if nothing is known to have been uploaded
+        there.
+        """
+        uploaded = self.remotes.get(remote)
+        if uploaded is None:
+            return None
+        return [
+            relpath
+            for relpath, entry in self.entries.items()
+            if uploaded.get(relpath) != _uploaded_state(entry)
+        ]
+
+    def mark_uploaded(self, remote, relpaths=None):
+        """
+        Records that `relpaths` (default all paths) have been uploaded to
+        `remote` in their current state. Paths no longer in the manifest are
+        forgotten.
+        """
+        uploaded = self.remotes.get(remote, {})
+        if relpaths is None:
+            relpaths = self.entries
+        for relpath in relpaths:
+            uploaded[relpath] = _uploaded_state(self.entries[relpath])
+        self.remotes[remote] = dict(
+            (relpath, state)
+            for relpath, state in uploaded.items()
+            if relpath in self.entries
+        )
+
+    def update(
+        self,
+        rendered,
+        written,
+        sources,
+        workers=None,
+        timings=None,
+        link_method=None,
+    ):
+        """
+        Brings the staging directory and the manifest up to date.
 
-        def _stg(x, ext=""):
-            # A remote track hosted elsewhere does not need staging. This is
-            # defined by a track with a url, but no source or filename.
+        Source files that are new, whose source, size or modification time
+        changed, or that were placed with a method `link_method` no longer
+        uses, are linked in. Files from the previous manifest that are no
+        longer part of the hub are removed from the staging directory.
+
+        Parameters
+        ----------
+
+        rendered : iterable
+            Paths of all rendered hub files
+
+        written : set
+            Paths of the rendered files that were written by this staging
+
+        sources : dict
+            Maps the path of each file to link to its source file
+
+        workers : int or None
+            Number of threads for the filesystem calls on source files and
+            links; default is `settings.STAGING_WORKERS`.
+
+        timings : dict or None
+            If provided, seconds spent in each phase are added to it.
+
+        link_method : str or None
+            One of :data:`LINK_METHODS`; default is
+            `settings.STAGING_LINK_METHOD`.
+
+        Returns the paths added or updated.
+        """
+        if workers is None:
+            workers = settings.STAGING_WORKERS
+        if timings is None:
+            timings = {}
+        methods = _link_methods(link_method)
+        old = self.entries
+        new = OrderedDict()
+        changed = []
+
+        for relpath in rendered:
+            entry = old.get(relpath)
+            if entry is None or entry["source"] is not None or relpath in written:
+                entry = _rendered_entry(self.path(relpath))
+                changed.append(relpath)
+            new[relpath] = entry
+
+        relpaths = []
+        paths = []
+        for relpath, source in sources.items():
+            if relpath in new:
+                continue
+            if not os.path.isabs(source):
+                source = os.path.abspath(source)
+            relpaths.append(relpath)
+            paths.append(source)
+        with _phase(timings, "stat"):
+            stats = _stat_all(paths, workers)
+
+        links = []
+        linked = []
+        for relpath, source, st in zip(relpaths, paths, stats):
+            entry = old.get(relpath)
             if (
-                x.source is None
-                and x.filename is None
-                and getattr(x, "url", None) is not None
+                entry is None
+                or entry["source"] != source
+                or entry["size"] != st.st_size
+                or entry["mtime"] != st.st_mtime
+                or entry.get("link", "symlink") not in methods
             ):
-                return
+                links.append((source, self.path(relpath), st))
+                linked.append(relpath)
+                entry = OrderedDict(
+                    [
+                        ("source", source),
+                        ("size", st.st_size),
+                        ("mtime", st.st_mtime),
+                        ("hash", None),
+                        ("link", None),
+                    ]
+                )
+                changed.append(relpath)
+            new[relpath] = entry
+        used = _link_all(links, workers, timings, methods)
+        for relpath, method in zip(linked, used):
+            new[relpath]["link"] = method
 
-            linknames.append(local_link(x.source + ext, x.filename + ext, staging))
+        with _phase(timings, "remove"):
+            removed = [relpath for relpath in old if relpath not in new]
+            for relpath in removed:
+                _remove_staged(self.staging, relpath)
 
-        _stg(x)
+        self.entries = new
+        self.changed = changed
+        self.removed = removed
+        return changed
 
-        if isinstance(x, track.Track):
-            if x.tracktype == "bam":
-                _stg(x, ext=".bai")
-            if x.tracktype == "vcfTabix":
-                _stg(x, ext=".tbi")
 
-        if isinstance(x, track.CompositeTrack):
-            if x._html:
-                _stg(x._html)
+def _uploaded_state(entry):
+    """
+    Returns what is recorded in Manifest.remotes for a manifest entry; the
+    link method doesn't change what is uploaded, so it is left out. A list,
+    so that it compares equal after being saved as JSON.
+    """
+    return [entry["source"], entry["size"], entry["mtime"], entry["hash"]]
 
-    return linknames
+
+def _rendered_entry(path):
+    with open(path, "rb") as fin:
+        contents = fin.read()
+    st = os.stat(path)
+    return OrderedDict(
+        [
+            ("source", None),
+            ("size", st.st_size),
+            ("mtime", st.st_mtime),
+            ("hash", hashlib.sha256(contents).hexdigest()),
+            ("link", None),
+        ]
+    )
+
+
+def _remove_staged(staging, relpath):
+    """
+    Removes a staged file, along with any directories left empty.
+    """
+    path = os.path.join(staging, relpath)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    staging = os.path.abspath(staging)
+    dirname = os.path.dirname(os.path.abspath(path))
+    while dirname != staging and dirname.startswith(staging):
+        try:
+            os.rmdir(dirname)
+        except OSError:
+            break
+        dirname = os.path.dirname(dirname)
 
 
-def stage_hub(hub, staging=None):
+def _relpath(filename):
+    """
+    Returns the path within the staging directory for `filename`.
+    """
+    relpath = filename.lstrip(os.path.sep)
+    # Most filenames are already normalized, and normpath() is comparatively
+    # slow for tens of thousands of files
+    if relpath.startswith(".") or "/." in relpath or "//" in relpath:
+        relpath = os.path.normpath(relpath)
+    return relpath
+
+
+def stage_hub(
+    hub,
+    staging=None,
+    skip_unchanged=False,
+    incremental=False,
+    workers=None,
+    timings=None,
+    link_method=None,
+):
     """
     Stage a hub by symlinking all its connected files to a local directory.
+
+    The hub is walked once: each hub file is rendered once and each source file
+    is symlinked once.
+
+    If `skip_unchanged` is True, hub files (hub.txt, genomes.txt, trackDb.txt,
+    etc) that already exist in `staging` with identical contents are left
+    untouched, so their modification times are preserved for rsync.
+
+    As with :meth:`HubComponent.render`, staging to the same directory again
+    only regenerates the hub files that may have changed.
+
+    If `incremental` is True, `staging` is treated as a persistent staging
+    area: a :class:`Manifest` of its contents is kept there, hub files are only
+    rewritten if their contents change, source files are only linked if they
+    are new or have changed, and files from a previous staging that are no
+    longer part of the hub are removed. Only the files added or updated are
+    returned.
+
+    Source files are checked and linked in a batch once the hub files are
+    rendered: the directories needed are created first, and then the
+    filesystem calls for each file are made by a pool of `workers` threads
+    (default `settings.STAGING_WORKERS`, 1, which makes them one at a time).
+    More workers help most when sources or staging are on a network
+    filesystem. The time spent in each phase
+    ("render", "stat", "mkdir", "link", and for incremental staging "remove"
+    and "save") is logged, and added to `timings` if a dictionary is provided.
+
+    `link_method` (default `settings.STAGING_LINK_METHOD`) chooses how source
+    files are placed in `staging`; see :data:`LINK_METHODS`. "symlink" is the
+    cheapest, but rsync then has to follow every link (its ``-L`` option).
+    "hardlink" gives real files without copying data, as long as sources are
+    on the same filesystem as `staging`, and staged files remain valid if the
+    sources are moved; "reflink" clones files on filesystems that support it;
+    otherwise files are copied. With "auto", each file is hard linked if
+    possible, else cloned, else copied. With `incremental`, the method used for
+    each file is recorded in the manifest.
+
+    Returns the staging directory and a list of every file that was rendered
+    or linked into it.
     """
-    linknames = []
     if staging is None:
         staging = tempfile.mkdtemp()
-    for obj, level in hub.leaves(base.HubComponent, intermediate=True):
-        linknames.extend(stage(obj, staging))
+    if workers is None:
+        workers = settings.STAGING_WORKERS
+    if timings is None:
+        timings = OrderedDict()
+    if incremental:
+        return staging, _stage_incremental(
+            hub, staging, workers, timings, link_method
+        )
+    methods = _link_methods(link_method)
+    manifest = OrderedDict()
+    links = []
+    with _phase(timings, "render"):
+        with base.render_session():
+            for obj, level in hub.leaves(base.HubComponent, intermediate=True):
+                stage(obj, staging, manifest, skip_unchanged, links=links)
+    with _phase(timings, "stat"):
+        stats = _stat_all([source for source, _ in links], workers)
+    links = [(source, linkname, st) for (source, linkname), st in zip(links, stats)]
+    _link_all(links, workers, timings, methods)
+    _log_timings(staging, timings)
 
-    return staging, linknames
+    return staging, list(manifest)
+
+
+def _stage_incremental(hub, staging, workers, timings, link_method):
+    """
+    Implements stage_hub() with incremental=True.
+    """
+    if not os.path.exists(staging):
+        os.makedirs(staging)
+    manifest = Manifest.load(staging)
+    staging = os.path.abspath(staging)
+    written = set()
+    sources = OrderedDict()
+    with _phase(timings, "render"), base.render_session() as session:
+        # instances() is cached until the hierarchy changes
+        for obj in hub.instances(base.HubComponent):
+            obj.validate()
+            rendered = obj._render(staging, skip_unchanged=True)
+            if rendered:
+                written.add(os.path.relpath(rendered, staging))
+            for source, filename in _sources(obj):
+                sources.setdefault(_relpath(filename), source)
+        rendered = OrderedDict(
+            (os.path.relpath(fn, staging), None) for _, fn in session.rendered
+        )
+
+    changed = manifest.update(
+        rendered, written, sources, workers, timings, link_method
+    )
+    with _phase(timings, "save"):
+        if changed or manifest.removed or not os.path.exists(
+            os.path.join(staging, Manifest.filename)
+        ):
+            manifest.save()
+    _log_timings(staging, timings)
+    return [manifest.path(relpath) for relpath in changed]
 
 
 def upload_hub(
-    hub, host, remote_dir, user=None, port=22, rsync_options=RSYNC_OPTIONS, staging=None
+    hub,
+    host,
+    remote_dir,
+    user=None,
+    port=22,
+    rsync_options=None,
+    staging=None,
+    skip_unchanged=False,
+    incremental=False,
+    workers=None,
+    link_method=None,
+    full_sync=False,
+    jobs=None,
+    shard_by="size",
 ):
     """
     Renders, stages, and uploads a hub.
+
+    See :func:`stage_hub` for `skip_unchanged`, `incremental`, `workers`, and
+    `link_method`. The first two are useful when re-using the same `staging`
+    directory across runs. If `staging` is None, a temporary staging
+    directory is used and removed afterwards.
+
+    If `rsync_options` is None, :data:`RSYNC_OPTIONS` is used, or, if source
+    files are not symlinked (see `link_method`),
+    :data:`RSYNC_OPTIONS_NO_SYMLINKS`, which lets rsync skip following links.
+
+    With `incremental`, the staging :class:`Manifest` also records what has
+    been uploaded to each remote directory, and only the files added or
+    changed since the last successful upload there are passed to rsync (with
+    ``--files-from``), so that rsync doesn't compare every file on both sides.
+    The whole staging directory is synced instead the first time a hub is
+    uploaded to a remote directory, or if `full_sync` is True; use that if the
+    remote files may have been changed or deleted by other means. Files of
+    tracks removed from the hub are not deleted from the remote directory.
+
+    If `jobs` (default `settings.UPLOAD_JOBS`) is more than 1, the files to
+    upload are split into that many shards (see :func:`partition`) of similar
+    total size, which are uploaded by concurrent rsync processes (see
+    :func:`upload_shards`); this helps when a single transfer can't use all
+    the bandwidth available. If `shard_by` is "genome", the files of each
+    genome are kept together in one shard rather than being balanced file by
+    file.
+
+    Returns the list of files staged, as returned by :func:`stage_hub`. If
+    `staging` is None, the temporary staging directory no longer exists by
+    the time this returns, so the paths are instead relative to it (and so to
+    `remote_dir`).
     """
-    hub.render()
-    if staging is None:
+    if jobs is None:
+        jobs = settings.UPLOAD_JOBS
+    key = _shard_key(shard_by)
+    if rsync_options is None:
+        if _link_methods(link_method) == LINK_METHODS["symlink"]:
+            rsync_options = RSYNC_OPTIONS
+        else:
+            rsync_options = RSYNC_OPTIONS_NO_SYMLINKS
+    cleanup = staging is None
+    if cleanup:
         staging = tempfile.mkdtemp()
-    staging, linknames = stage_hub(hub, staging=staging)
-    local_dir = os.path.join(staging)
+    try:
+        staging, linknames = stage_hub(
+            hub,
+            staging=staging,
+            skip_unchanged=skip_unchanged,
+            incremental=incremental,
+            workers=workers,
+            link_method=link_method,
+        )
+        if incremental:
+            _upload_incremental(
+                host, user, staging, remote_dir, rsync_options, full_sync, jobs, key
+            )
+        elif jobs > 1:
+            shards = partition(_staged_sizes(staging, workers), jobs, key)
+            upload_shards(
+                host, user, staging, remote_dir, shards, rsync_options, jobs
+            )
+        else:
+            upload(
+                host,
+                user,
+                local_dir=staging,
+                remote_dir=remote_dir,
+                rsync_options=rsync_options,
+            )
+    finally:
+        if cleanup:
+            shutil.rmtree(staging, ignore_errors=True)
+    if cleanup:
+        return [os.path.relpath(i, staging) for i in linknames]
+    return linknames
+
+
+def _upload_incremental(
+    host, user, staging, remote_dir, rsync_options, full_sync, jobs, key
+):
+    """
+    Implements upload_hub() with incremental=True.
+    """
+    manifest = Manifest.load(staging)
+    remote = remote_string(host, user, remote_dir)
+    files = None if full_sync else manifest.pending(remote)
+    if files == []:
+        logger.info("Nothing changed since the last upload to %s", remote)
+        return
+    if jobs > 1:
+        if files is None:
+            files = list(manifest.entries)
+        sizes = OrderedDict((i, manifest.entries[i]["size"]) for i in files)
+        try:
+            upload_shards(
+                host,
+                user,
+                staging,
+                remote_dir,
+                partition(sizes, jobs, key),
+                rsync_options,
+                jobs,
+            )
+        except UploadError as e:
+            # Shards that made it don't need uploading again
+            manifest.mark_uploaded(remote, e.uploaded)
+            manifest.save()
+            raise
+        manifest.mark_uploaded(remote, files)
+        manifest.save()
+        return
     upload(
         host,
         user,
-        local_dir=local_dir,
+        local_dir=staging,
         remote_dir=remote_dir,
         rsync_options=rsync_options,
+        files=files,
     )
-    return linknames
+    manifest.mark_uploaded(remote, files)
+    manifest.save()
@@ -9,8 +9,23 @@ exactly one string character:
     @validator("a", "1")
     def one_char(v):
         return isinstance(v, string_types) and len(v) == 1
+
+Validators for structured formats can also provide a `fast` check, either a
+regular expression that must match the entire string or a function. Values
+passing the fast check are accepted immediately; anything else falls through
+to the decorated function, which decides whether the value is valid and
+produces the error. A fast check must therefore never accept a value that the
+decorated function would reject:
+
+    @validator("a", "1", fast=r".")
+    def one_char(v):
+        return isinstance(v, string_types) and len(v) == 1
 """
+import re
+import sys
 import warnings
+import threading
+from collections import OrderedDict
 from .compatibility import string_types
 from . import settings
 
@@ -19,51 +34,144 @@ class ValidationError(Exception):
     pass
 
 
-def validator(*example):
+class ValidationCache(object):
+    def __init__(self, maxsize=4096):
+        """
+        Bounded least-recently-used cache of validation results.
+
+        Most values in a large hub are repeated many times (the same color,
+        visibility, or type across thousands of tracks), so
+        :meth:`Param.validate` checks here before running a validator.
+
+        Only results are cached. Values that fail by raising an exception are
+        not cached, so the exception is raised again each time.
+
+        Parameters
+        ----------
+
+        maxsize : int
+            Maximum number of results to keep. Set to 0 to disable caching.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        # The counters are updated under the same lock as the lookup, since
+        # `+=` is not atomic across threads
+        with self._lock:
+            try:
+                result = self._results[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def set(self, key, result):
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all cached results and resets the hit/miss counters.
+        """
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """
+        Returns a dictionary of cache statistics.
+        """
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                maxsize=self.maxsize,
+                currsize=len(self._results),
+            )
+
+
+validation_cache = ValidationCache()
+
+_missing = object()
+
+
+def validator(*example, fast=None):
     """
-    Decorator that runs a self-test on the validator it decorates
+    Decorator that wraps a validator, recording its example values.
+
+    The examples are not checked when the decorator runs, which would slow
+    down importing trackhub; call the `self_test()` method of the result
+    instead (the test suite does this for every validator).
+
+    If `fast` is provided, it is checked first and values it accepts are not
+    passed to the decorated function. It can be a regular expression, which
+    accepts strings that it matches in their entirety, or a function returning
+    True for values to accept.
     """
 
-    def wrapper(func):
+    if isinstance(fast, string_types):
+        fast_match = re.compile(fast).fullmatch
 
-        # Try running validation on the function's own example . . . it better
-        # work!
-        example_string = []
-        try:
-            for ex in example:
-                func(ex)
-                example_string.append(ex)
-            example_string = "Example value(s): %s" % (
-                " or ".join("%r" % i for i in example_string)
-            )
+        def fast_check(v):
+            return isinstance(v, string_types) and fast_match(v) is not None
 
-        except Exception as e:
-            raise ValueError(
-                "Error validating example (func=%s, example=%r)! "
-                "\nOriginal error:\n\t%s: %s"
-                % (func.__name__, example, e.__class__.__name__, e.message)
-            )
+    else:
+        fast_match = None
+        fast_check = fast
 
+    def wrapper(func):
         class Validator(object):
             """
             Class to wrap a function and display an example value.
             """
 
-            _func = func
+            _func = staticmethod(func)
+            _fast = staticmethod(fast_check) if fast_check is not None else None
+            examples = example
 
             def __call__(self, v):
+                if fast_match is not None:
+                    if type(v) is str and fast_match(v) is not None:
+                        return True
+                elif fast_check is not None and fast_check(v):
+                    return True
                 try:
                     result = func(v)
                 except Exception as e:
                     result = False
                 if not result and settings.VALIDATE:
                     raise ValidationError(
-                        "Value {0} failed {1} validation; {2}".format(
-                            v, func.__name__, example_string
+                        "Value {0} failed {1} validation; "
+                        "Example value(s): {2}".format(
+                            v, func.__name__, " or ".join("%r" % i for i in example)
                         )
                     )
                 return result
 
+            def self_test(self):
+                """
+                Runs the validator on each of its own example values, raising
+                ValueError if any of them raises an exception.
+                """
+                for ex in example:
+                    try:
+                        func(ex)
+                    except Exception as e:
+                        raise ValueError(
+                            "Error validating example (func=%s, example=%r)! "
+                            "\nOriginal error:\n\t%s: %s"
+                            % (func.__name__, ex, e.__class__.__name__, e)
+                        )
+
             def __str__(self):
                 return "<Validator [%s] at %s> sample: %s" % (
                     func.__name__,
@@ -116,6 +224,9 @@ class Param(object):
 
         >>> Param(name='test', fmt=['test <#>'], types=['bigBed'], required=False, validator=int).validate(0)
         True
+
+        >>> Param(name='test', fmt=['test <#>'], types=['bigBed'], required=False, validator=int).validate('lots')
+        False
         """
         self.name = name
         self.fmt = fmt
@@ -127,6 +238,25 @@ class Param(object):
         return '<%s "%s" at %s>' % (self.__class__.__name__, self.name, id(self))
 
     def validate(self, value):
+        """
+        Validates `value`, returning True if it passes.
+
+        Results are cached in `validation_cache`, keyed by this parameter and
+        the value (along with the value's type and the current
+        settings.VALIDATE, both of which can change the outcome). Values that
+        can't be hashed are always validated directly.
+        """
+        key = (self, type(value), value, settings.VALIDATE)
+        try:
+            result = validation_cache.get(key, _missing)
+        except TypeError:
+            return self._validate(value)
+        if result is _missing:
+            result = self._validate(value)
+            validation_cache.set(key, result)
+        return result
+
+    def _validate(self, value):
 
         if isinstance(self.validator, set):
             if value in self.validator:
@@ -135,10 +265,15 @@ class Param(object):
         if isinstance(self.validator, type):
             if isinstance(value, self.validator):
                 return True
-            else:
-                # Otherwise, allow any exceptions to propagate up.
+            # Otherwise the value must be convertible (e.g., "100" for int).
+            # Failing is reported like any other validator, so callers raise
+            # ParameterError, or accept the value if settings.VALIDATE is
+            # False.
+            try:
                 self.validator(value)
-                return True
+            except (TypeError, ValueError):
+                return False
+            return True
 
         if hasattr(self.validator, "__call__"):
             return self.validator(value)
@@ -148,6 +283,297 @@ class Param(object):
         return False
 
 
+class ValidationReport(object):
+    """
+    Errors and warnings collected by :meth:`HubComponent.validate_all`.
+
+    Attributes
+    ----------
+
+    errors : list
+        List of (path, message) tuples, where `path` identifies the component
+        (e.g., "myhub/hg38/TrackDb/sample1") and `message` describes the
+        problem.
+
+    warnings : list
+        List of (path, message) tuples for warnings, in the same format.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+
+    @property
+    def ok(self):
+        """
+        True if no errors were found (warnings are allowed).
+        """
+        return not self.errors
+
+    def grouped(self, kind="errors"):
+        """
+        Groups identical messages together.
+
+        Parameters
+        ----------
+
+        kind : "errors" or "warnings"
+
+        Returns
+        -------
+        List of (message, count, paths) tuples, most frequent first.
+        """
+        groups = OrderedDict()
+        for path, message in getattr(self, kind):
+            groups.setdefault(message, []).append(path)
+        return sorted(
+            ((message, len(paths), paths) for message, paths in groups.items()),
+            key=lambda x: -x[1],
+        )
+
+    def raise_errors(self):
+        """
+        Raises a ValidationError summarizing all errors, if there are any.
+        """
+        if self.errors:
+            raise ValidationError(str(self))
+
+    def __str__(self):
+        s = [
+            "{0} error(s), {1} warning(s)".format(
+                len(self.errors), len(self.warnings)
+            )
+        ]
+        for kind in ("errors", "warnings"):
+            groups = self.grouped(kind)
+            if groups:
+                s.append(kind + ":")
+            for message, count, paths in groups:
+                s.append(
+                    "  [{0}x] {1} (first seen at {2})".format(count, message, paths[0])
+                )
+        return "\n".join(s)
+
+
+def _check_values(items):
+    """
+    Validates (name, value) parameter pairs, returning an (error, warnings)
+    tuple for each. `error` is None if the value passed.
+
+    Runs in worker processes when validate_all() is called with `processes`.
+    """
+    from . import constants
+
+    results = []
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for name, value in items:
+            n = len(caught)
+            try:
+                if constants.param_dict[name]._validate(value):
+                    error = None
+                else:
+                    error = 'value "{0}" did not validate for parameter "{1}"'
+                    error = error.format(value, name)
+            except Exception as e:
+                error = 'parameter "{0}": {1}'.format(name, e)
+            results.append((error, [str(w.message) for w in caught[n:]]))
+    return results
+
+
+def _label(component):
+    """
+    Name used for `component` in validation report paths.
+    """
+    for attr in ("name", "genome", "hub"):
+        try:
+            value = getattr(component, attr, None)
+        except Exception:
+            value = None
+        if isinstance(value, string_types):
+            return value
+    return component.__class__.__name__
+
+
+def _walk(component, report, uses, unhashable, caught):
+    """
+    Runs validate() on `component` and everything below it, and collects the
+    parameters to validate (see validate_all()).
+    """
+    from .track import BaseTrack
+    from .genome import Genome
+
+    stack = [(component, _label(component))]
+    while stack:
+        obj, path = stack.pop()
+        n = len(caught)
+        try:
+            obj.validate()
+        except Exception as e:
+            report.errors.append((path, "{0}: {1}".format(type(e).__name__, e)))
+        if len(caught) > n:
+            report.warnings.extend((path, str(w.message)) for w in caught[n:])
+
+        if isinstance(obj, BaseTrack):
+            params, known = obj._params, obj._fields.names
+        elif isinstance(obj, Genome):
+            params, known = obj._orig_kwargs, obj.track_field_order
+        else:
+            params, known = {}, ()
+        for name, value in params.items():
+            if value is None:
+                continue
+            if name not in known:
+                report.errors.append((path, 'unknown parameter "{0}"'.format(name)))
+                continue
+            key = (name, type(value), value)
+            try:
+                uses.setdefault(key, []).append(path)
+            except TypeError:
+                unhashable.append((path, name, value))
+
+        stack.extend(
+            (child, path + "/" + _label(child)) for child in reversed(obj.children)
+        )
+
+
+def validate_all(component, processes=None):
+    """
+    Validates `component` and everything below it, collecting all problems
+    into a :class:`ValidationReport` rather than stopping at the first one.
+
+    Each component's own validate() method is run, and each parameter that
+    has been set on a track or genome is checked to be known for it and to
+    have a valid value. Each distinct parameter value is only validated once,
+    no matter how many tracks use it.
+
+    Parameters
+    ----------
+
+    component : HubComponent
+
+    processes : int or None
+        If more than 1, parameter values are validated in this many worker
+        processes. Only worth it for very large hubs with many distinct
+        values.
+    """
+    report = ValidationReport()
+
+    # Paths using each distinct (name, value) pair
+    uses = OrderedDict()
+
+    # (path, name, value) for values that can't be deduplicated
+    unhashable = []
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        _walk(component, report, uses, unhashable, caught)
+
+    items = [(key[0], key[2]) for key in uses]
+    if processes is not None and processes > 1 and len(items) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        size = max(1, len(items) // (processes * 4))
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        with ProcessPoolExecutor(processes) as executor:
+            results = [
+                r for chunk in executor.map(_check_values, chunks) for r in chunk
+            ]
+    else:
+        results = _check_values(items)
+
+    all_paths = list(uses.values())
+    all_paths.extend([path] for path, _, _ in unhashable)
+    results.extend(_check_values([(name, value) for _, name, value in unhashable]))
+    for paths, (error, warned) in zip(all_paths, results):
+        if error is not None:
+            report.errors.extend((path, error) for path in paths)
+        for message in warned:
+            report.warnings.extend((path, message) for path in paths)
+    return report
+
+
+def _passes(param, value):
+    if value is None:
+        return True
+    try:
+        return bool(param._validate(value))
+    except Exception:
+        return False
+
+
+def validate_column(name, values):
+    """
+    Validates a column of values for a single parameter.
+
+    This is intended for building many tracks at once from a table (e.g.,
+    a sample sheet) where the same values tend to be repeated down each
+    column. Each distinct value is validated only once, and rows that fail
+    are reported rather than raising an exception.
+
+    Parameters
+    ----------
+
+    name : str
+        Parameter name, e.g. "color" or "priority"
+
+    values : iterable or numpy array
+        Values for the parameter, one per row. None means the parameter is not
+        set for that row, and is considered valid.
+
+    Returns
+    -------
+    Tuple of (mask, failed), where `mask` has one boolean per row that is True
+    if the value passed validation, and `failed` holds the indices of the rows
+    that did not pass. If `values` is a numpy array these are numpy arrays as
+    well, otherwise they are lists.
+
+    Examples
+    --------
+
+    >>> validate_column("color", ["128,0,0", "128,0", "128,0,0", None])
+    ([True, False, True, True], [1])
+    """
+    # constants builds Param objects using the validators in this module
+    from . import constants
+
+    try:
+        param = constants.param_dict[name]
+    except KeyError:
+        raise ValidationError('"{0}" is not a known parameter'.format(name))
+
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(values, np.ndarray):
+        try:
+            uniques, inverse = np.unique(values, return_inverse=True)
+        except TypeError:
+            # e.g., object arrays mixing None and strings can't be sorted
+            uniques = None
+        if uniques is not None:
+            passed = np.array(
+                [_passes(param, v) for v in uniques.tolist()], dtype=bool
+            )
+            mask = passed[inverse.ravel()]
+            return mask, np.flatnonzero(~mask)
+        mask, failed = validate_column(name, values.tolist())
+        return np.array(mask, dtype=bool), np.array(failed, dtype=int)
+
+    # The value's type is part of the key since e.g. 1 == 1.0 == True but
+    # they don't necessarily validate the same way.
+    results = {}
+    mask = []
+    for v in values:
+        key = (type(v), v)
+        try:
+            ok = results[key]
+        except KeyError:
+            ok = results[key] = _passes(param, v)
+        except TypeError:
+            ok = _passes(param, v)
+        mask.append(ok)
+    return mask, [i for i, ok in enumerate(mask) if not ok]
+
+
 @validator("tag=value", "tag1=val1 tag2=val2")
 def key_val(v):
     try:
@@ -203,7 +629,13 @@ def ColSV2_numbers_or_single_number(v):
     return True
 
 
-@validator("128,0,255")
+# 0-255 without leading zeros. Anything else int() accepts (e.g. "007") is
+# left to the full validator.
+_byte = r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+_rgb = r"{0},{0},{0}".format(_byte)
+
+
+@validator("128,0,255", fast=_rgb)
 def RGB(v):
     if " " in v:
         raise ValueError("Space in RGB tuple")
@@ -223,7 +655,7 @@ def RGB(v):
     return True
 
 
-@validator("128,0,0 90,90,5")
+@validator("128,0,0 90,90,5", fast=r"{0} {0}".format(_rgb))
 def RGBList(v):
     rgbs = v.split(" ")
     assert len(rgbs) == 2, "RGBList not a space-separated list of RGB tuples"
@@ -258,15 +690,14 @@ def ucsc_position(v):
     return True
 
 
-@validator("asdf1234_33", "AZ90")
+_alphanumeric_ = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"
+
+
+@validator("asdf1234_33", "AZ90", fast=r"[a-zA-Z0-9_]*")
 def alphanumeric_(v):
-    valid = "abcdefghijklmnopqrstuvwxyz"
-    valid += "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    valid += "01234556789"
-    valid += "_"
     assert isinstance(v, string_types)
     for i in v:
-        if i not in valid:
+        if i not in _alphanumeric_:
             return False
     return True
 
@@ -321,7 +752,30 @@ def float_like(v):
         return False
 
 
-@validator("#ff0000", "maroon")
+_named_colors = frozenset(
+    [
+        "black",
+        "silver",
+        "gray",
+        "white",
+        "maroon",
+        "red",
+        "purple",
+        "fuchsia",
+        "green",
+        "lime",
+        "olive",
+        "yellow",
+        "navy",
+        "blue",
+        "teal",
+        "aqua",
+    ]
+)
+_hex_or_named = "#[0-9A-F]{6}|" + "|".join(sorted(_named_colors))
+
+
+@validator("#ff0000", "maroon", fast=_hex_or_named)
 def hex_or_named(v):
     valid = "0123456789ABCDEF"
     try:
@@ -330,26 +784,7 @@ def hex_or_named(v):
             for i in v[1:]:
                 assert i in valid
         else:
-            assert v in set(
-                [
-                    "black",
-                    "silver",
-                    "gray",
-                    "white",
-                    "maroon",
-                    "red",
-                    "purple",
-                    "fuchsia",
-                    "green",
-                    "lime",
-                    "olive",
-                    "yellow",
-                    "navy",
-                    "blue",
-                    "teal",
-                    "aqua",
-                ]
-            )
+            assert v in _named_colors
     except AssertionError:
         return False
     return True